@@ -0,0 +1,76 @@
+"""Lazy, cached loading of fonts, images and sounds.
+
+Nothing is loaded, and the mixer is not even started, until an asset is
+first asked for; after that every lookup is a dict hit.  Screens can call
+font()/image()/sound() every frame instead of keeping their own copies, and
+re-entering a screen no longer goes back to the disk.  load_times records
+how long each asset took so startup cost can be measured.
+"""
+import os
+import time
+
+import pygame
+
+DEFAULT_FONT = "default"
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class AssetManager:
+    def __init__(self, fonts=None, base_dir=ASSET_DIR):
+        # fonts maps a key to (font name, size); DEFAULT_FONT is pygame's
+        # bundled font and None is pygame's built-in font at its own scale.
+        self.font_specs = dict(fonts or {})
+        self.base_dir = base_dir
+        self.load_times = {}
+        self._fonts = {}
+        self._images = {}
+        self._sounds = {}
+
+    def path(self, name):
+        return os.path.join(self.base_dir, name)
+
+    def _timed(self, key, load):
+        started = time.perf_counter()
+        asset = load()
+        self.load_times[key] = time.perf_counter() - started
+        return asset
+
+    def font(self, key, size=None):
+        """Return a font by registered key, or by (name, size) when size is given."""
+        spec = (key, size) if size is not None else self.font_specs[key]
+        font = self._fonts.get(spec)
+        if font is None:
+            name, point_size = spec
+            if not pygame.font.get_init():
+                pygame.font.init()
+            path = pygame.font.get_default_font() if name == DEFAULT_FONT else name
+            font = self._fonts[spec] = self._timed(f"font:{name}:{point_size}",
+                                                   lambda: pygame.font.Font(path, point_size))
+        return font
+
+    def image(self, name):
+        image = self._images.get(name)
+        if image is None:
+            image = self._timed(f"image:{name}", lambda: pygame.image.load(self.path(name)))
+            if pygame.display.get_surface():
+                image = image.convert_alpha()
+            self._images[name] = image
+        return image
+
+    def sound(self, name):
+        """Return a Sound, or None if there is no audio device or the file won't load."""
+        if name not in self._sounds:
+            def load():
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                return pygame.mixer.Sound(self.path(name))
+            try:
+                self._sounds[name] = self._timed(f"sound:{name}", load)
+            except pygame.error:
+                self._sounds[name] = None
+        return self._sounds[name]
+
+    def clear(self):
+        self._fonts.clear()
+        self._images.clear()
+        self._sounds.clear()
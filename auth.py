@@ -0,0 +1,31 @@
+"""Run signup and login off the caller's thread.
+
+bcrypt deliberately takes hundreds of milliseconds and releases the GIL
+while it works, so a small thread pool keeps the pygame loop (or an asyncio
+server) responsive while hashes are computed.  Each submit_* call returns a
+concurrent.futures.Future resolving to the usual (success, message) tuple.
+"""
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+import game2048
+
+MAX_WORKERS = 4
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="auth")
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def submit_signup(username, password):
+    return get_executor().submit(game2048.signup, username, password)
+
+
+def submit_login(username, password):
+    return get_executor().submit(game2048.login, username, password)
@@ -0,0 +1,114 @@
+"""Vectorized simulation of many boards at once with NumPy.
+
+Boards are held as one ``(N, SIZE, SIZE)`` integer array of tile values, the
+same numbers a ``mat`` holds.  A step applies one move per board, spawns a
+tile the way ``add_new`` does and reports per-board score deltas and
+game-over flags, matching ``swipe_*``, ``add_new`` and ``is_game_over``.
+
+Spawning draws from a NumPy ``Generator``.  Functions that take ``rng`` also
+accept a seed, ``None`` or a ``random.Random`` (as the rest of the game
+uses), which is turned into a Generator seeded from it.
+"""
+import numpy as np
+
+from game_core import SIZE, LEFT, RIGHT, UP, DOWN
+
+
+def _to_left(boards, direction):
+    """View boards so that `direction` becomes a left move."""
+    if direction == RIGHT:
+        return boards[:, :, ::-1]
+    if direction == UP:
+        return boards.transpose(0, 2, 1)
+    if direction == DOWN:
+        return boards.transpose(0, 2, 1)[:, :, ::-1]
+    return boards
+
+
+def _from_left(boards, direction):
+    if direction == DOWN:
+        return boards[:, :, ::-1].transpose(0, 2, 1)
+    return _to_left(boards, direction)
+
+
+def _slide_rows_left(rows):
+    """Slide and merge an (M, size) array of rows to the left in place.
+
+    Returns the score gained by each row.
+    """
+    size = rows.shape[1]
+    order = np.argsort(rows == 0, axis=1, kind="stable")
+    rows[:] = np.take_along_axis(rows, order, axis=1)
+    score = np.zeros(len(rows), dtype=np.int64)
+    for k in range(size - 1):
+        merge = (rows[:, k] != 0) & (rows[:, k] == rows[:, k + 1])
+        if not merge.any():
+            continue
+        rows[merge, k] *= 2
+        score[merge] += rows[merge, k]
+        rows[merge, k + 1:size - 1] = rows[merge, k + 2:]
+        rows[merge, size - 1] = 0
+    return score
+
+
+def move_boards(boards, moves):
+    """Apply moves[n] to boards[n] in place and return the score per board."""
+    moves = np.asarray(moves)
+    n, size, _ = boards.shape
+    score = np.zeros(n, dtype=np.int64)
+    for direction in (LEFT, RIGHT, UP, DOWN):
+        selected = np.flatnonzero(moves == direction)
+        if not len(selected):
+            continue
+        oriented = np.ascontiguousarray(_to_left(boards[selected], direction))
+        rows = oriented.reshape(-1, size)
+        score[selected] = _slide_rows_left(rows).reshape(-1, size).sum(axis=1)
+        boards[selected] = _from_left(oriented, direction)
+    return score
+
+
+def as_generator(rng):
+    """Return a NumPy Generator for rng, seeding a new one from a random.Random."""
+    if hasattr(rng, "getrandbits"):
+        return np.random.default_rng(rng.getrandbits(64))
+    return np.random.default_rng(rng)
+
+
+def add_new_boards(boards, rng):
+    """Place a 2 or 4 on a uniformly chosen empty cell of every non-full board."""
+    rng = as_generator(rng)
+    n, size, _ = boards.shape
+    empty = (boards == 0).reshape(n, -1)
+    keys = rng.random(empty.shape)
+    keys[~empty] = -1.0
+    cells = keys.argmax(axis=1)
+    values = np.where(rng.random(n) < 0.5, 2, 4)
+    has_room = np.flatnonzero(empty.any(axis=1))
+    rows, cols = np.divmod(cells[has_room], size)
+    boards[has_room, rows, cols] = values[has_room]
+
+
+def game_over_mask(boards):
+    full = (boards != 0).all(axis=(1, 2))
+    horizontal = (boards[:, :, :-1] == boards[:, :, 1:]).any(axis=(1, 2))
+    vertical = (boards[:, :-1, :] == boards[:, 1:, :]).any(axis=(1, 2))
+    return full & ~horizontal & ~vertical
+
+
+def new_boards(n, rng, size=SIZE):
+    """Start n games, each with two spawned tiles like start_game."""
+    rng = as_generator(rng)
+    boards = np.zeros((n, size, size), dtype=np.int64)
+    add_new_boards(boards, rng)
+    add_new_boards(boards, rng)
+    return boards
+
+
+def step(boards, moves, rng):
+    """Move, spawn and check every board.
+
+    Returns (score_deltas, game_over) arrays of length N.
+    """
+    score = move_boards(boards, moves)
+    add_new_boards(boards, rng)
+    return score, game_over_mask(boards)
@@ -0,0 +1,248 @@
+"""Micro-benchmarks for the game engine and the score store.
+
+Every benchmark reports calls per second (best of several repeats) and the
+peak memory allocated by a single call.  Results can be saved as a JSON
+baseline and later runs compared against it; anything slower than the
+threshold is flagged and makes the run exit non-zero.
+
+Usage:
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --compare baseline.json --threshold 0.10
+    python benchmarks.py --filter swipe
+"""
+import argparse
+import atexit
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bitboard
+import game2048
+from game_core import SIZE, DIRECTIONS, Board, start_game, add_new, merge_tiles, swipe_left, swipe_right, swipe_up, swipe_down, is_game_over, swipe
+
+SEED = 2048
+BOARD_COUNT = 256
+
+BENCHMARKS = {}
+
+
+def benchmark(name, number=1000):
+    """Register a factory that does its setup and returns the callable to time."""
+    def register(factory):
+        BENCHMARKS[name] = (factory, number)
+        return factory
+    return register
+
+
+def random_boards(count=BOARD_COUNT, seed=SEED):
+    """Mid-game boards reached by random play, so moves see realistic merges."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        mat = start_game(rng)
+        for _ in range(rng.randrange(5, 60)):
+            swipe(mat, rng.choice(DIRECTIONS))
+            add_new(mat, rng)
+            if is_game_over(mat):
+                break
+        boards.append(mat)
+    return boards
+
+
+def _cycle_copies(boards):
+    source = itertools.cycle(boards)
+    return lambda: [row[:] for row in next(source)]
+
+
+@benchmark("merge_tiles", number=50000)
+def bench_merge_tiles():
+    lines = itertools.cycle([[n for n in row if n] for mat in random_boards() for row in mat])
+    return lambda: merge_tiles(next(lines))
+
+
+def _bench_swipe(function):
+    def factory():
+        next_board = _cycle_copies(random_boards())
+        return lambda: function(next_board())
+    return factory
+
+
+for _function in (swipe_left, swipe_right, swipe_up, swipe_down):
+    benchmark(_function.__name__, number=20000)(_bench_swipe(_function))
+
+
+def _bench_analyze(cached):
+    def factory():
+        engine = bitboard.get_engine()
+        boards = itertools.cycle([engine.to_board(mat) for mat in random_boards()])
+        if cached:
+            return lambda: engine.analyze(next(boards))
+
+        def run():
+            engine.analysis_cache.clear()
+            return engine.analyze(next(boards))
+        return run
+    return factory
+
+
+benchmark("analyze", number=50000)(_bench_analyze(True))
+benchmark("analyze_uncached", number=20000)(_bench_analyze(False))
+
+
+@benchmark("add_new", number=20000)
+def bench_add_new():
+    next_board = _cycle_copies(random_boards())
+    rng = random.Random(SEED)
+    return lambda: add_new(next_board(), rng)
+
+
+@benchmark("is_game_over", number=50000)
+def bench_is_game_over():
+    boards = itertools.cycle(random_boards())
+    return lambda: is_game_over(next(boards))
+
+
+@benchmark("random_game", number=20)
+def bench_random_game():
+    rng = random.Random(SEED)
+
+    def play():
+        mat = start_game(rng)
+        while not is_game_over(mat):
+            swipe(mat, rng.choice(DIRECTIONS))
+            add_new(mat, rng)
+    return play
+
+
+@benchmark("board_random_game", number=20)
+def bench_board_random_game():
+    rng = random.Random(SEED)
+
+    def play():
+        board = Board.new(rng)
+        while not board.is_game_over():
+            board.move(rng.choice(DIRECTIONS))
+            board.spawn(rng)
+    return play
+
+
+def _temp_store():
+    directory = tempfile.mkdtemp(prefix="bench2048-")
+    atexit.register(shutil.rmtree, directory, True)
+    path = os.path.join(directory, "scores.db")
+    game2048.configure_store(path)
+    game2048.create_table()
+    return path
+
+
+@benchmark("db_signup", number=5)
+def bench_signup():
+    _temp_store()
+    names = (f"user{n}" for n in itertools.count())
+    return lambda: game2048.signup(next(names), "password")
+
+
+@benchmark("db_login", number=5)
+def bench_login():
+    _temp_store()
+    game2048.signup("player", "password")
+    return lambda: game2048.login("player", "password")
+
+
+@benchmark("db_get_high_score", number=5000)
+def bench_get_high_score():
+    _temp_store()
+    game2048.signup("player", "password")
+    return lambda: game2048.get_high_score("player")
+
+
+@benchmark("db_save_high_score", number=2000)
+def bench_save_high_score():
+    _temp_store()
+    game2048.signup("player", "password")
+    scores = itertools.count(1)
+    return lambda: game2048.save_high_score("player", next(scores))
+
+
+def measure(factory, number, repeat=5):
+    run = factory()
+    run()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(min(number, 50)):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            run()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_sec": round(number / best, 2), "peak_alloc_bytes": peak}
+
+
+def run_benchmarks(names=None, repeat=5, scale=1.0):
+    results = {}
+    for name, (factory, number) in BENCHMARKS.items():
+        if names and not any(part in name for part in names):
+            continue
+        results[name] = measure(factory, max(1, int(number * scale)), repeat)
+        print(f"{name:<20} {results[name]['ops_per_sec']:>14,.1f} ops/s {results[name]['peak_alloc_bytes']:>10,} B peak",
+              file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline ops/s, current ops/s, change)] for regressions beyond threshold."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        change = current["ops_per_sec"] / previous["ops_per_sec"] - 1.0
+        if change < -threshold:
+            regressions.append((name, previous["ops_per_sec"], current["ops_per_sec"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the 2048 engine and score store.")
+    parser.add_argument("--filter", action="append", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="run a tenth of the usual iterations")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.repeat, 0.1 if args.quick else 1.0)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "size": SIZE, "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:,.1f} -> {after:,.1f} ops/s ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""Packed-integer move engine for the 2048 board.
+
+A board is a single Python int holding the log2 exponent of every tile in a
+5-bit cell (0 = empty, 1 = 2, 2 = 4, ...).  Cell (i, j) lives at bit
+offset (i * size + j) * CELL_BITS, so each row is a row_bits-wide slice and
+moves are a handful of row-table lookups instead of list rebuilding.
+Transposing is table-driven too: each row is looked up already spread down
+a column, so up and down moves cost about twice a left or right move.
+
+Every supported board size gets its own Engine with its own row tables and
+transpose shifts; get_engine() caches one per size so games of different
+sizes can run side by side.  The module-level functions use the default
+SIZE engine.
+
+analyze() returns all four moves of a position in one call and keeps the
+answers in a bounded LRU cache keyed by the board int, so hint lookups,
+legality checks and bots that revisit positions pay for each board once.
+An entry costs roughly 650 bytes on a 5x5 board, so the default of
+ANALYSIS_CACHE_SIZE entries stays around 10 MB; pass cache_size to
+get_engine() to trade memory for hit rate.
+
+The row tables are bounded the same way as game_core's line cache: a table
+holding ROW_TABLE_SIZE rows is emptied before the next row is added, so a
+long-running server or simulation keeps a fixed footprint while the rows of
+the current games are quickly relearned.
+"""
+import random
+from collections import OrderedDict, namedtuple
+
+from game_core import SIZE, check_size
+
+CELL_BITS = 5
+CELL_MASK = (1 << CELL_BITS) - 1
+MAX_EXPONENT = CELL_MASK
+ANALYSIS_CACHE_SIZE = 16384
+ROW_TABLE_SIZE = 1 << 16
+
+MoveResult = namedtuple("MoveResult", ["board", "score", "legal"])
+
+
+class Engine:
+    def __init__(self, size, cache_size=ANALYSIS_CACHE_SIZE):
+        check_size(size)
+        self.size = size
+        self.cells = size * size
+        self.row_bits = size * CELL_BITS
+        self.row_mask = (1 << self.row_bits) - 1
+        self.row_shifts = [i * self.row_bits for i in range(size)]
+        self.column_shifts = [i * CELL_BITS for i in range(size)]
+        # Row tables are keyed by the packed row and filled on first use.  A
+        # full table for 5-bit cells would hold 2**(5 * size) entries, far
+        # more than any game touches; precompute() warms up the common part.
+        # Each table holds at most table_size rows.
+        self.table_size = ROW_TABLE_SIZE
+        self.left_table = {}
+        self.right_table = {}
+        # The same row laid out down column 0, for transpose(), and the
+        # left/right results laid out that way, for moves on a transposed board.
+        self.column_table = {}
+        self.up_table = {}
+        self.down_table = {}
+        self.moves = (self.move_left, self.move_right, self.move_up, self.move_down)
+        self.cache_size = cache_size
+        self.analysis_cache = OrderedDict()
+
+    def _unpack_row(self, row):
+        return [(row >> (k * CELL_BITS)) & CELL_MASK for k in range(self.size)]
+
+    def _pack_row(self, cells):
+        row = 0
+        for k, exponent in enumerate(cells):
+            row |= exponent << (k * CELL_BITS)
+        return row
+
+    def _slide_row(self, cells):
+        """Slide exponents towards index 0 using the same rules as merge_tiles."""
+        tiles = [e for e in cells if e]
+        merged = []
+        score = 0
+        k = 0
+        while k < len(tiles):
+            if k + 1 < len(tiles) and tiles[k] == tiles[k + 1]:
+                exponent = min(tiles[k] + 1, MAX_EXPONENT)
+                merged.append(exponent)
+                score += 1 << exponent
+                k += 2
+            else:
+                merged.append(tiles[k])
+                k += 1
+        return merged + [0] * (self.size - len(merged)), score
+
+    def _row_entry(self, row, table, reverse):
+        entry = table.get(row)
+        if entry is None:
+            cells = self._unpack_row(row)
+            if reverse:
+                cells.reverse()
+            moved, score = self._slide_row(cells)
+            if reverse:
+                moved.reverse()
+            entry = self._remember(table, row, (self._pack_row(moved), score))
+        return entry
+
+    def _remember(self, table, row, entry):
+        if len(table) >= self.table_size:
+            table.clear()
+        table[row] = entry
+        return entry
+
+    def precompute(self, max_exponent=11):
+        """Fill the row tables for every row whose tiles are at most 2**max_exponent.
+
+        table_size is raised to fit those rows, so the warmed tables are kept.
+        """
+        base = max_exponent + 1
+        self.table_size = max(self.table_size, base ** self.size)
+        for n in range(base ** self.size):
+            cells = []
+            for _ in range(self.size):
+                n, e = divmod(n, base)
+                cells.append(e)
+            row = self._pack_row(cells)
+            self._row_entry(row, self.left_table, False)
+            self._row_entry(row, self.right_table, True)
+            self._column_entry(row)
+            self._column_move_entry(row, self.up_table, self.left_table, False)
+            self._column_move_entry(row, self.down_table, self.right_table, True)
+
+    def to_board(self, mat):
+        """Pack a list-of-lists mat into a board int."""
+        board = 0
+        shift = 0
+        for row in mat:
+            for value in row:
+                if value:
+                    board |= (value.bit_length() - 1) << shift
+                shift += CELL_BITS
+        return board
+
+    def to_mat(self, board):
+        """Unpack a board int into a fresh list-of-lists mat."""
+        mat = []
+        for shift in self.row_shifts:
+            row = (board >> shift) & self.row_mask
+            mat.append([1 << e if e else 0 for e in self._unpack_row(row)])
+        return mat
+
+    def get_cell(self, board, i, j):
+        exponent = (board >> ((i * self.size + j) * CELL_BITS)) & CELL_MASK
+        return 1 << exponent if exponent else 0
+
+    def _column_entry(self, row):
+        column = self.column_table.get(row)
+        if column is None:
+            column = 0
+            for k, exponent in enumerate(self._unpack_row(row)):
+                column |= exponent << (k * self.row_bits)
+            self._remember(self.column_table, row, column)
+        return column
+
+    def transpose(self, board):
+        """Swap rows and columns of a board: row i becomes column i."""
+        columns = self.column_table
+        result = 0
+        for shift, column_shift in zip(self.row_shifts, self.column_shifts):
+            row = (board >> shift) & self.row_mask
+            if row:
+                result |= (columns.get(row) or self._column_entry(row)) << column_shift
+        return result
+
+    def _move_rows(self, board, table, reverse):
+        result = 0
+        score = 0
+        for shift in self.row_shifts:
+            row = (board >> shift) & self.row_mask
+            if row:
+                moved, gained = table.get(row) or self._row_entry(row, table, reverse)
+                result |= moved << shift
+                score += gained
+        return result, score
+
+    def move_left(self, board):
+        return self._move_rows(board, self.left_table, False)
+
+    def move_right(self, board):
+        return self._move_rows(board, self.right_table, True)
+
+    def _column_move_entry(self, row, table, row_table, reverse):
+        moved, score = self._row_entry(row, row_table, reverse)
+        return self._remember(table, row, (self._column_entry(moved), score))
+
+    def _move_columns(self, board, table, row_table, reverse):
+        """Move every column of a board: its transposed rows map straight to moved columns."""
+        transposed = self.transpose(board)
+        result = 0
+        score = 0
+        for shift, column_shift in zip(self.row_shifts, self.column_shifts):
+            row = (transposed >> shift) & self.row_mask
+            if row:
+                moved, gained = table.get(row) or self._column_move_entry(row, table, row_table, reverse)
+                result |= moved << column_shift
+                score += gained
+        return result, score
+
+    def move_up(self, board):
+        return self._move_columns(board, self.up_table, self.left_table, False)
+
+    def move_down(self, board):
+        return self._move_columns(board, self.down_table, self.right_table, True)
+
+    def move(self, board, direction):
+        """Apply a move and return (new_board, score_gained)."""
+        return self.moves[direction](board)
+
+    def _move_both(self, board):
+        """Slide every row left and right in a single pass over the rows."""
+        left = right = left_score = right_score = 0
+        for shift in self.row_shifts:
+            row = (board >> shift) & self.row_mask
+            if row:
+                moved, gained = self.left_table.get(row) or self._row_entry(row, self.left_table, False)
+                left |= moved << shift
+                left_score += gained
+                moved, gained = self.right_table.get(row) or self._row_entry(row, self.right_table, True)
+                right |= moved << shift
+                right_score += gained
+        return left, left_score, right, right_score
+
+    def _move_both_columns(self, board):
+        """Slide every column up and down in a single pass over the transposed rows."""
+        transposed = self.transpose(board)
+        up = down = up_score = down_score = 0
+        for shift, column_shift in zip(self.row_shifts, self.column_shifts):
+            row = (transposed >> shift) & self.row_mask
+            if row:
+                moved, gained = (self.up_table.get(row)
+                                 or self._column_move_entry(row, self.up_table, self.left_table, False))
+                up |= moved << column_shift
+                up_score += gained
+                moved, gained = (self.down_table.get(row)
+                                 or self._column_move_entry(row, self.down_table, self.right_table, True))
+                down |= moved << column_shift
+                down_score += gained
+        return up, up_score, down, down_score
+
+    def analyze(self, board):
+        """Return a MoveResult(board, score, legal) for each direction, indexed by direction.
+
+        The board is transposed once for up and down, and the result is
+        cached, so repeated questions about a position cost a dict lookup.
+        """
+        cache = self.analysis_cache
+        result = cache.get(board)
+        if result is not None:
+            cache.move_to_end(board)
+            return result
+        left, left_score, right, right_score = self._move_both(board)
+        up, up_score, down, down_score = self._move_both_columns(board)
+        result = cache[board] = (
+            MoveResult(left, left_score, left != board),
+            MoveResult(right, right_score, right != board),
+            MoveResult(up, up_score, up != board),
+            MoveResult(down, down_score, down != board),
+        )
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def set_cache_size(self, cache_size):
+        """Change how many analyze() results are kept, dropping the oldest if over."""
+        self.cache_size = cache_size
+        while len(self.analysis_cache) > cache_size:
+            self.analysis_cache.popitem(last=False)
+
+    def legal_moves(self, board):
+        return [direction for direction, result in enumerate(self.analyze(board)) if result.legal]
+
+    def empty_cells(self, board):
+        """Return the cell indices (i * size + j) that are empty."""
+        return [k for k in range(self.cells) if not (board >> (k * CELL_BITS)) & CELL_MASK]
+
+    def count_empty(self, board):
+        count = 0
+        for k in range(self.cells):
+            if not board & CELL_MASK:
+                count += 1
+            board >>= CELL_BITS
+        return count
+
+    def max_tile(self, board):
+        best = 0
+        while board:
+            best = max(best, board & CELL_MASK)
+            board >>= CELL_BITS
+        return 1 << best if best else 0
+
+    def add_random_tile(self, board, rng=random):
+        """Place a 2 or 4 on a random empty cell, mirroring add_new."""
+        cells = self.empty_cells(board)
+        if not cells:
+            return board
+        k = rng.choice(cells)
+        return board | (rng.choice([1, 2]) << (k * CELL_BITS))
+
+    def is_game_over(self, board):
+        if self.count_empty(board):
+            return False
+        # On a full board a left or up move changes something only if it merges.
+        return self.move_left(board)[0] == board and self.move_up(board)[0] == board
+
+
+_engines = {}
+
+
+def get_engine(size=SIZE, cache_size=None):
+    """Return the shared Engine for a board size, building it on first use.
+
+    cache_size, if given, sets how many analyze() results that engine keeps.
+    """
+    engine = _engines.get(size)
+    if engine is None:
+        engine = _engines[size] = Engine(size, ANALYSIS_CACHE_SIZE if cache_size is None else cache_size)
+    elif cache_size is not None:
+        engine.set_cache_size(cache_size)
+    return engine
+
+
+_default = get_engine(SIZE)
+ROW_BITS = _default.row_bits
+ROW_MASK = _default.row_mask
+
+precompute = _default.precompute
+to_board = _default.to_board
+to_mat = _default.to_mat
+get_cell = _default.get_cell
+transpose = _default.transpose
+move_left = _default.move_left
+move_right = _default.move_right
+move_up = _default.move_up
+move_down = _default.move_down
+MOVES = _default.moves
+move = _default.move
+analyze = _default.analyze
+legal_moves = _default.legal_moves
+empty_cells = _default.empty_cells
+count_empty = _default.count_empty
+max_tile = _default.max_tile
+add_random_tile = _default.add_random_tile
+is_game_over = _default.is_game_over
@@ -1,17 +1,27 @@
+import time
+STARTED = time.perf_counter()  # measured before the pygame import, for --startup-time
+
+import argparse
 import pygame
-import random
-import sys
 import sqlite3
-import bcrypt
-import time
+import sys
+from assets import AssetManager, DEFAULT_FONT
+from bitboard import get_engine
+from profiler import FrameProfiler
+from renderer import GridRenderer
+from auth import submit_login, submit_signup
+from game2048 import create_table, get_high_score, get_score_writer, get_leaderboard, get_stats_writer, get_user_stats
+from game_stats import GameRecord
+from history import BoardHistory, DEFAULT_MAX_BYTES
+from game_core import SIZE, MIN_SIZE, MAX_SIZE, LEFT, RIGHT, UP, DOWN, Board, add_new, swipe
+from replay import ReplayRecorder
+from solver import hint
 
 
-SIZE = 5
-TILE_SIZE = 100
 PADDING = 10
-WINDOW_WIDTH = SIZE * TILE_SIZE + 800
-WINDOW_HEIGHT = SIZE * TILE_SIZE + 150
-ANIMATION_SPEED = 150
+BOARD_PIXELS = 500
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
 
 BACKGROUND_COLOR = (250, 248, 239)
 TILE_COLOR = {
@@ -30,69 +40,14 @@ TILE_COLOR = {
 }
 TEXT_COLOR = {0: (119, 110, 101), 2: (119, 110, 101), 4: (119, 110, 101), 8: (255, 255, 255)}
 
-pygame.font.init()
-FONT_MAIN = pygame.font.Font(pygame.font.get_default_font(), 40)
-FONT_SCORE = pygame.font.Font(pygame.font.get_default_font(), 24)
-FONT_INPUT = pygame.font.Font(pygame.font.get_default_font(), 28)
-DB_NAME = 'high_scores.db'
-
-def create_table():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT, high_score INTEGER)''')
-    conn.commit()
-    conn.close()
-
-def signup(username, password):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-    try:
-        cursor.execute("INSERT INTO users (username, password, high_score) VALUES (?, ?, ?)", (username, hashed_password, 0))
-        conn.commit()
-        return True, "Signup successful!"
-    except sqlite3.IntegrityError:
-        return False, "Username already exists. Please choose a different username."
-    finally:
-        conn.close()
-
-def login(username, password):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    if result and bcrypt.checkpw(password.encode(), result[0]):
-        return True, "Login successful!"
-    else:
-        return False, "Invalid username or password."
-
-def get_high_score(username):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT high_score FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else 0
-
-def save_high_score(username, score):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE users SET high_score = ? WHERE username = ? AND high_score < ?", (score, username, score))
-    conn.commit()
-    conn.close()
-
-def start_game():
-    mat = [[0] * SIZE for _ in range(SIZE)]
-    add_new(mat)
-    add_new(mat)
-    return mat
-
-def add_new(mat):
-    empty_cells = [(i, j) for i in range(SIZE) for j in range(SIZE) if mat[i][j] == 0]
-    if empty_cells:
-        i, j = random.choice(empty_cells)
-        mat[i][j] = random.choice([2, 4])
+ASSETS = AssetManager(fonts={
+    "main": (DEFAULT_FONT, 40),
+    "score": (DEFAULT_FONT, 24),
+    "input": (DEFAULT_FONT, 28),
+    "profile": (None, 20),
+})
+LOGO_IMAGE = 'logo5.png'
+MERGE_SOUND = 'merge.wav'
 
 def draw_text(window, text, position, font, color):
     text_surface = font.render(text, True, color)
@@ -102,9 +57,9 @@ def draw_text(window, text, position, font, color):
 def draw_input_box(win, text, rect, active):
     color = (0, 0, 0) if active else (150, 150, 150)
     pygame.draw.rect(win, color, rect, 2)
-    draw_text(win, text, (rect.x + 5, rect.y + 5), FONT_SCORE, (0, 0, 0))
+    draw_text(win, text, (rect.x + 5, rect.y + 5), ASSETS.font("score"), (0, 0, 0))
 
-def main_menu_screen(win):
+def main_menu_screen(win, on_first_frame=None):
     running = True
     selected_option = None
     button_color = (100, 100, 250)
@@ -112,22 +67,26 @@ def main_menu_screen(win):
 
     while running:
         win.fill((240, 230, 200))
-        draw_text(win, "2048 Deep Version", (win.get_width() // 2 - 120, 80), FONT_MAIN, (102, 51, 0))
+        draw_text(win, "2048 Deep Version", (win.get_width() // 2 - 120, 80), ASSETS.font("main"), (102, 51, 0))
 
         # Buttons
         buttons = [
             {"label": "Start Game", "rect": pygame.Rect(win.get_width() // 2 - 100, 200, 200, 50)},
             {"label": "About", "rect": pygame.Rect(win.get_width() // 2 - 100, 280, 200, 50)},
-            {"label": "Exit", "rect": pygame.Rect(win.get_width() // 2 - 100, 360, 200, 50)},
+            {"label": "Leaderboard", "rect": pygame.Rect(win.get_width() // 2 - 100, 360, 200, 50)},
+            {"label": "Exit", "rect": pygame.Rect(win.get_width() // 2 - 100, 440, 200, 50)},
         ]
 
         # Draw Buttons
         for button in buttons:
             color = button_hover_color if button["rect"].collidepoint(pygame.mouse.get_pos()) else button_color
             pygame.draw.rect(win, color, button["rect"], border_radius=8)
-            draw_text(win, button["label"], (button["rect"].x + 50, button["rect"].y + 10), FONT_SCORE, (255, 255, 255))
+            draw_text(win, button["label"], (button["rect"].x + 50, button["rect"].y + 10), ASSETS.font("score"), (255, 255, 255))
 
         pygame.display.flip()
+        if on_first_frame:
+            on_first_frame(win)
+            on_first_frame = None
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -141,6 +100,9 @@ def main_menu_screen(win):
                     selected_option = "about"
                     running = False
                 elif buttons[2]["rect"].collidepoint(event.pos):
+                    selected_option = "leaderboard"
+                    running = False
+                elif buttons[3]["rect"].collidepoint(event.pos):
                     pygame.quit()
                     sys.exit()
 
@@ -154,7 +116,7 @@ def display_error_message(win, message):
     text_color = (255, 0, 0)  
     
     
-    error_text = FONT_MAIN.render(message, True, text_color)
+    error_text = ASSETS.font("main").render(message, True, text_color)
     
     
     text_width = error_text.get_width()
@@ -170,7 +132,6 @@ def display_error_message(win, message):
 
 
 
-FONT_LABEL = pygame.font.Font(None, 36)
 def login_signup_screen(win):
     username = ''
     password = ''
@@ -179,19 +140,22 @@ def login_signup_screen(win):
     cursor_timer = time.time()
     is_signup = False  
     message = ""
-    background_image = pygame.image.load('logo5.png')  
+    background_image = ASSETS.image(LOGO_IMAGE)
     image_rect = background_image.get_rect() 
+    auth_request = None
+    message_until = 0
+    clock = pygame.time.Clock()
     running = True
     while running:
         win.fill((240, 230, 200))  
-        draw_text(win, "Login / Signup", (win.get_width() // 2 - 90, 50), FONT_MAIN, (102, 51, 0))
+        draw_text(win, "Login / Signup", (win.get_width() // 2 - 90, 50), ASSETS.font("main"), (102, 51, 0))
 
         
-        draw_text(win, "Username:", (30, 150), FONT_SCORE, (0, 0, 0))
-        draw_text(win, "Password:", (20, 230), FONT_SCORE, (0, 0, 0))
+        draw_text(win, "Username:", (30, 150), ASSETS.font("score"), (0, 0, 0))
+        draw_text(win, "Password:", (20, 230), ASSETS.font("score"), (0, 0, 0))
 
         
-        message_width = FONT_SCORE.size(message)[0]  
+        message_width = ASSETS.font("score").size(message)[0]  
 
 
         x_position = (win.get_width() - message_width) // 2
@@ -215,11 +179,11 @@ def login_signup_screen(win):
 
         
         username_display = username + ('|' if show_cursor and active_field == "username" else '')
-        draw_text(win, username_display, (username_rect.x + 10, username_rect.y + 5), FONT_INPUT, (0, 0, 0))
+        draw_text(win, username_display, (username_rect.x + 10, username_rect.y + 5), ASSETS.font("input"), (0, 0, 0))
 
         
         password_display = '*' * len(password) + ('|' if show_cursor and active_field == "password" else '')
-        draw_text(win, password_display, (password_rect.x + 10, password_rect.y + 5), FONT_INPUT, (0, 0, 0))
+        draw_text(win, password_display, (password_rect.x + 10, password_rect.y + 5), ASSETS.font("input"), (0, 0, 0))
 
         
         login_signup_button = pygame.Rect(win.get_width() // 2 - 70, 310, 80, 40)
@@ -230,11 +194,30 @@ def login_signup_screen(win):
         pygame.draw.rect(win, (100, 150, 250), login_signup_button, border_radius=8)
         pygame.draw.rect(win, (50, 100, 200), toggle_button, border_radius=8)
 
-        draw_text(win, button_label, (login_signup_button.x + 12, login_signup_button.y + 5), FONT_SCORE, (255, 255, 255))
-        draw_text(win, "" + ("Signup" if is_signup else "Login"), (toggle_button.x + 10, toggle_button.y + 5), FONT_SCORE, (255, 255, 255))
+        draw_text(win, button_label, (login_signup_button.x + 12, login_signup_button.y + 5), ASSETS.font("score"), (255, 255, 255))
+        draw_text(win, "" + ("Signup" if is_signup else "Login"), (toggle_button.x + 10, toggle_button.y + 5), ASSETS.font("score"), (255, 255, 255))
+
+        if auth_request is not None:
+            spinner = "|/-\\"[int(time.time() * 8) % 4]
+            draw_text(win, f"Please wait {spinner}", (win.get_width() // 2 - 70, win.get_height() - 50), ASSETS.font("score"), (0, 0, 0))
+        elif message and time.time() < message_until:
+            draw_text(win, message, (x_position, win.get_height() - 50), ASSETS.font("score"), (255, 0, 0))
 
         pygame.display.flip()
 
+        if auth_request is not None and auth_request[1].done():
+            submitted_username, future = auth_request
+            auth_request = None
+            try:
+                success, message = future.result()
+            except ValueError as e:
+                # e.g. bcrypt rejects passwords longer than 72 bytes
+                success, message = False, str(e)
+            if success:
+                return submitted_username
+            message_until = time.time() + 2
+
+
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -247,33 +230,25 @@ def login_signup_screen(win):
                 elif password_rect.collidepoint(event.pos):
                     active_field = "password"
                 elif login_signup_button.collidepoint(event.pos):
-                    
+                    if auth_request is not None:
+                        continue
+                    # bcrypt runs on the auth pool; the result is picked up above
+                    # and belongs to the name submitted here, not whatever is typed later.
                     if not is_signup:  
-                        success, message = signup(username, password)
-                        if success:
-                            return username  
-                        else:
-                            draw_text(win, message, (x_position, win.get_height() - 50), FONT_SCORE, (255, 0, 0))
-
-
-                            pygame.display.flip()
-                            pygame.time.delay(2000)  
+                        auth_request = (username, submit_signup(username, password))
                     else:  # Login
-                        success, message = login(username, password)
-                        if success:
-                            return username  
-                        else:
-                            draw_text(win, message, (x_position, win.get_height() - 50), FONT_SCORE, (255, 0, 0))
-
-                            pygame.display.flip()
-                            pygame.time.delay(2000)  
+                        auth_request = (username, submit_login(username, password))
                 elif toggle_button.collidepoint(event.pos):
-                    
+                    if auth_request is not None:
+                        continue
+
                     is_signup = not is_signup
                     username = ''
                     password = '' 
 
             elif event.type == pygame.KEYDOWN:
+                if auth_request is not None:
+                    continue
                 if active_field == "username":
                     if event.key == pygame.K_BACKSPACE:
                         username = username[:-1]
@@ -285,19 +260,23 @@ def login_signup_screen(win):
                     else:
                         password += event.unicode
 
+        clock.tick(30)
+
 
 
 def game_info_screen(win):
     running = True
     while running:
         win.fill((240, 230, 200))  
-        draw_text(win, "Welcome to 2048 Deep Version!", (50, 50), FONT_MAIN, (102, 51, 0))
-        draw_text(win, "Objective: Combine tiles to reach the highest score possible.", (50, 150), FONT_SCORE, (51, 51, 0))
-        draw_text(win, "Rules:", (50, 200), FONT_SCORE, (51, 51, 0))
-        draw_text(win, "- Use arrow keys to slide tiles.", (70, 250), FONT_SCORE, (51, 51, 0))
-        draw_text(win, "- Combine tiles of the same value to increase score.", (70, 280), FONT_SCORE, (51, 51, 0))
-        draw_text(win, "- Game over when no moves are left.", (70, 310), FONT_SCORE, (51, 51, 0))
-        draw_text(win, "Press Enter to Start the Game!", (50, 400), FONT_SCORE, (204, 0, 0))
+        draw_text(win, "Welcome to 2048 Deep Version!", (50, 50), ASSETS.font("main"), (102, 51, 0))
+        draw_text(win, "Objective: Combine tiles to reach the highest score possible.", (50, 150), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "Rules:", (50, 200), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "- Use arrow keys to slide tiles.", (70, 250), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "- Combine tiles of the same value to increase score.", (70, 280), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "- Game over when no moves are left.", (70, 310), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "- Press H for a hint, S for your stats, L for the leaderboard.", (70, 340), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "- Press Z to undo a move and Y to redo it.", (70, 370), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "Press Enter to Start the Game!", (50, 400), ASSETS.font("score"), (204, 0, 0))
         pygame.display.flip()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -308,151 +287,270 @@ def game_info_screen(win):
                     return
 
 
-def swipe_left(mat):
-    score = 0
-    for i in range(SIZE):
-        new_row = [num for num in mat[i] if num != 0]
-        new_row, merges = merge_tiles(new_row)
-        mat[i] = new_row + [0] * (SIZE - len(new_row))
-        score += merges
-    return score
-
-def swipe_right(mat):
-    score = 0
-    for i in range(SIZE):
-        new_row = [num for num in mat[i] if num != 0]
-        new_row.reverse()
-        new_row, merges = merge_tiles(new_row)
-        mat[i] = [0] * (SIZE - len(new_row)) + new_row[::-1]
-        score += merges
-    return score
-
-def swipe_up(mat):
-    score = 0
-    for j in range(SIZE):
-        new_col = [mat[i][j] for i in range(SIZE) if mat[i][j] != 0]
-        new_col, merges = merge_tiles(new_col)
-        for i in range(SIZE):
-            mat[i][j] = new_col[i] if i < len(new_col) else 0
-        score += merges
-    return score
-
-def swipe_down(mat):
-    score = 0
-    for j in range(SIZE):
-        new_col = [mat[i][j] for i in range(SIZE) if mat[i][j] != 0]
-        new_col.reverse()
-        new_col, merges = merge_tiles(new_col)
-        new_col.reverse()
-        for i in range(SIZE):
-            mat[i][j] = new_col[i] if i < len(new_col) else 0
-        score += merges
-    return score
-
-pygame.mixer.init()
-merge_sound = pygame.mixer.Sound("merge.wav")
-def merge_tiles(tiles):
-    score = 0
-    merged = []
-    skip = False
-    for i in range(len(tiles)):
-        if skip:
-            skip = False
-            continue
-        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
-            merged.append(tiles[i] * 2)
-            score += tiles[i] * 2
-            skip = True
-            merge_sound.play() 
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def stats_screen(win, username):
+    stats = get_user_stats(username)
+    if stats:
+        lines = [
+            f"Games played: {stats['games']}",
+            f"Best score: {stats['best_score']}",
+            f"Average score: {stats['average_score']:.0f}",
+            f"Average moves: {stats['average_moves']:.0f}",
+            f"Average game: {format_duration(stats['average_duration'])}",
+            f"Games in the last 7 days: {sum(n for _, n in stats['games_per_day'])}",
+        ]
+        tiles = stats['best_tiles'][:10]
+    while True:
+        win.fill((240, 230, 200))
+        draw_text(win, f"{username}'s Stats", (60, 40), ASSETS.font("main"), (102, 51, 0))
+        if stats:
+            for k, line in enumerate(lines):
+                draw_text(win, line, (60, 120 + k * 36), ASSETS.font("score"), (51, 51, 0))
+            draw_text(win, "Best tile", (500, 120), ASSETS.font("score"), (51, 0, 102))
+            for k, (tile, games) in enumerate(tiles):
+                draw_text(win, f"{tile}", (500, 156 + k * 30), ASSETS.font("score"), (51, 51, 0))
+                draw_text(win, f"x {games}", (620, 156 + k * 30), ASSETS.font("score"), (51, 51, 0))
         else:
-            merged.append(tiles[i])
-    return merged, score
-
-def is_game_over(mat):
-    for i in range(SIZE):
-        for j in range(SIZE):
-            if mat[i][j] == 0 or (j < SIZE - 1 and mat[i][j] == mat[i][j + 1]) or (i < SIZE - 1 and mat[i][j] == mat[i + 1][j]):
-                return False
-    return True
-
-def draw_grid(win, mat, score, high_score, game_over, username):
-    win.fill((245, 245, 220)) 
-    for i in range(SIZE):
-        for j in range(SIZE):
-            tile_value = mat[i][j]
-            color = TILE_COLOR.get(tile_value, (60, 58, 50))
-            pygame.draw.rect(win, color, (j * TILE_SIZE + PADDING, i * TILE_SIZE + PADDING + 100, TILE_SIZE - PADDING, TILE_SIZE - PADDING), border_radius=8)
-            if tile_value > 0:
-                text_color = TEXT_COLOR.get(tile_value, (255, 255, 255))
-                text_surface = FONT_MAIN.render(str(tile_value), True, text_color)
-                text_rect = text_surface.get_rect(center=(j * TILE_SIZE + TILE_SIZE // 2 + PADDING, i * TILE_SIZE + TILE_SIZE // 2 + 100))
-                win.blit(text_surface, text_rect)
-    draw_text(win, f"Score: {score}", (SIZE * TILE_SIZE + 50, 150), FONT_SCORE, (51, 0, 102))
-    draw_text(win, f"High Score: {high_score}", (SIZE * TILE_SIZE + 50, 200), FONT_SCORE, (51, 0, 102))
-    draw_text(win, f"Welcome, {username}!", (SIZE * TILE_SIZE + 50, 100), FONT_SCORE, (51, 0, 102))
-    if game_over:
-        draw_text(win, "Game Over!", (SIZE * TILE_SIZE // 2 - 50, SIZE * TILE_SIZE // 2), FONT_MAIN, (204, 0, 0))
-        draw_text(win, f"Well played, {username}!", (SIZE * TILE_SIZE // 2 - 70, SIZE * TILE_SIZE // 2 + 40), FONT_SCORE, (204, 0, 0))
-        draw_text(win, "Press R to Restart", (SIZE * TILE_SIZE // 2 - 50, SIZE * TILE_SIZE // 2 + 80), FONT_SCORE, (204, 0, 0))
-    pygame.display.flip()
-
-
-
-def main():
-    pygame.init()
+            draw_text(win, "No finished games yet.", (60, 150), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "Press Enter to go back", (win.get_width() // 2 - 130, win.get_height() - 60), ASSETS.font("score"), (204, 0, 0))
+        pygame.display.flip()
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            return "quit"
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_ESCAPE, pygame.K_s):
+            return None
+
+
+def leaderboard_screen(win, username=None):
+    leaderboard = get_leaderboard()
+    entries = leaderboard.top(10)
+    if username:
+        rank = leaderboard.rank(username)
+        if rank and rank > 10:
+            entries = entries + [entry for entry in leaderboard.around(username, 1) if entry[0] > 10]
+    while True:
+        win.fill((240, 230, 200))
+        draw_text(win, "Leaderboard", (win.get_width() // 2 - 110, 40), ASSETS.font("main"), (102, 51, 0))
+        for k, (rank, name, high_score) in enumerate(entries):
+            color = (204, 0, 0) if name == username else (51, 51, 0)
+            y = 110 + k * 32
+            draw_text(win, f"{rank}.", (win.get_width() // 2 - 220, y), ASSETS.font("score"), color)
+            draw_text(win, name, (win.get_width() // 2 - 150, y), ASSETS.font("score"), color)
+            draw_text(win, str(high_score), (win.get_width() // 2 + 120, y), ASSETS.font("score"), color)
+        if not entries:
+            draw_text(win, "No scores yet.", (win.get_width() // 2 - 80, 150), ASSETS.font("score"), (51, 51, 0))
+        draw_text(win, "Press Enter to go back", (win.get_width() // 2 - 130, win.get_height() - 60), ASSETS.font("score"), (204, 0, 0))
+        pygame.display.flip()
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            return "quit"
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_ESCAPE, pygame.K_l):
+            return None
+
+
+SWIPE_KEYS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+}
+UNDO_KEYS = {pygame.K_z: "undo", pygame.K_y: "redo"}
+REPLAY_FILE = 'replays.bin'
+
+
+def board_layout(size):
+    """Tile size and tile font that fit a size x size board into BOARD_PIXELS."""
+    tile_size = BOARD_PIXELS // size
+    return tile_size, ASSETS.font(DEFAULT_FONT, tile_size * 2 // 5)
+
+
+def draw_profile_overlay(win, profiler):
+    summary = profiler.summary()
+    rect = pygame.Rect(BOARD_PIXELS + 40, 300, win.get_width() - BOARD_PIXELS - 40, 24 + 20 * len(summary))
+    win.fill((245, 245, 220), rect)
+    rows = [("ms", "p50", "p95", "p99")]
+    rows += [(name, f"{stats['p50']:.2f}", f"{stats['p95']:.2f}", f"{stats['p99']:.2f}") for name, stats in summary.items()]
+    for k, row in enumerate(rows):
+        for text, x in zip(row, (10, 120, 170, 220)):
+            draw_text(win, text, (rect.x + x, rect.y + 20 * k), ASSETS.font("profile"), (80, 80, 80))
+    pygame.display.update(rect)
+
+
+def report_startup(win):
+    """Print how long it took to get the first menu frame on screen, then exit."""
+    first_frame = time.perf_counter() - STARTED
+    print(f"cold start: {first_frame * 1000:.1f} ms to first menu frame")
+    for name, seconds in ASSETS.load_times.items():
+        print(f"  {name}: {seconds * 1000:.1f} ms")
+    pygame.quit()
+    sys.exit()
+
+
+def game_record(username, mat, score, moves, started_at):
+    now = time.time()
+    return GameRecord(username, score, max(map(max, mat)), moves, now - started_at, now, len(mat))
+
+
+def main(profile_path=None, size=SIZE, startup_time=False, history_bytes=DEFAULT_MAX_BYTES):
+    # Only the modules the menus need; the mixer starts when a sound is first loaded.
+    pygame.display.init()
+    pygame.font.init()
     win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("2048 Deep Version")
     create_table()
-    win = pygame.display.set_mode((800, 600))  
-
-    
-    selected_option = main_menu_screen(win)
-    
-    if selected_option == "start":
-        username = login_signup_screen(win)
-        high_score = get_high_score(username)
-        game_info_screen(win)
-    elif selected_option == "about":
-        game_info_screen(win)
-        main() 
-    else:
-        pygame.quit()
-        sys.exit()
 
+    # Sub-screens return here, so visiting them repeatedly doesn't grow the stack.
+    while True:
+        selected_option = main_menu_screen(win, report_startup if startup_time else None)
+        if selected_option == "start":
+            break
+        elif selected_option == "about":
+            game_info_screen(win)
+        elif selected_option == "leaderboard":
+            if leaderboard_screen(win) == "quit":
+                pygame.quit()
+                sys.exit()
+        else:
+            pygame.quit()
+            sys.exit()
+
+    username = login_signup_screen(win)
+    high_score = get_high_score(username)
+    game_info_screen(win)
+
+    merge_sound = ASSETS.sound(MERGE_SOUND)
+    score_writer = get_score_writer()
+    stats_writer = get_stats_writer()
+    recorder = ReplayRecorder(REPLAY_FILE, size)
+    rng = recorder.start()
     score = 0
-    mat = start_game()
-    clock = pygame.time.Clock()
+    mat = Board.new(rng, size)
+    started_at = time.time()
     game_over = False
+    used_undo = False
+    # All four moves of the current position; tells no-op keys apart and
+    # doubles as the game-over check.
+    engine = get_engine(size)
+    outcomes = engine.analyze(engine.to_board(mat))
+    hint_direction = None
+    history = BoardHistory(size, history_bytes)
+    history.reset(engine.to_board(mat))
+    tile_size, tile_font = board_layout(size)
+    renderer = GridRenderer(win, size, tile_size, PADDING, TILE_COLOR, TEXT_COLOR, tile_font, ASSETS.font("score"))
+    profiler = FrameProfiler(enabled=profile_path is not None)
 
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if not game_over:
-                    if event.key == pygame.K_LEFT:
-                        score += swipe_left(mat)
-                        add_new(mat)
-                    elif event.key == pygame.K_RIGHT:
-                        score += swipe_right(mat)
-                        add_new(mat)
-                    elif event.key == pygame.K_UP:
-                        score += swipe_up(mat)
-                        add_new(mat)
-                    elif event.key == pygame.K_DOWN:
-                        score += swipe_down(mat)
-                        add_new(mat)
-                    game_over = is_game_over(mat)
-                    if score > high_score:
-                        high_score = score
-                        save_high_score(username, high_score)
-                if game_over and event.key == pygame.K_r:
-                    score = 0
-                    mat = start_game()
-                    game_over = False
-        draw_grid(win, mat, score, high_score, game_over, username)
-        clock.tick(ANIMATION_SPEED)
+        # Sleep until something happens instead of redrawing at a fixed rate.
+        pending = [pygame.event.wait()] + pygame.event.get()
+        profiler.begin_frame()
+        quitting = False
+        screen = None
+        with profiler.section("events"):
+            for event in pending:
+                if event.type == pygame.QUIT:
+                    quitting = True
+                    break
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    renderer.invalidate()
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in UNDO_KEYS:
+                        # Undo works on a finished game too, to take back the
+                        # move that ended it.
+                        state = history.undo() if UNDO_KEYS[event.key] == "undo" else history.redo()
+                        if state:
+                            packed, score = state
+                            mat = Board(engine.to_mat(packed))
+                            outcomes = engine.analyze(packed)
+                            game_over = not any(outcome.legal for outcome in outcomes)
+                            hint_direction = None
+                            # Spawns after an undo no longer follow the seed's
+                            # sequence, so this game can't be replayed, and its
+                            # scores no longer count.
+                            used_undo = True
+                            recorder.cancel()
+                    elif not game_over:
+                        events = []
+                        direction = SWIPE_KEYS.get(event.key)
+                        if direction is not None and outcomes[direction].legal:
+                            with profiler.section("swipe"):
+                                score += swipe(mat, direction, events)
+                            with profiler.section("add_new"):
+                                add_new(mat, rng)
+                            recorder.record(direction)
+                            hint_direction = None
+                            with profiler.section("analyze"):
+                                packed = engine.to_board(mat)
+                                outcomes = engine.analyze(packed)
+                                game_over = not any(outcome.legal for outcome in outcomes)
+                            history.push(packed, score)
+                        elif event.key == pygame.K_h:
+                            hint_direction = hint(engine.to_board(mat), engine)
+                        if events and merge_sound:
+                            merge_sound.play()
+                        if score > high_score and not used_undo:
+                            high_score = score
+                            with profiler.section("save_high_score"):
+                                score_writer.submit(username, high_score)
+                        if game_over and not used_undo:
+                            stats_writer.submit(game_record(username, mat, score, history.position, started_at))
+                            score_writer.request_flush()
+                            stats_writer.request_flush()
+                            recorder.finish(score)
+                    if game_over and event.key == pygame.K_r:
+                        score = 0
+                        rng = recorder.start()
+                        mat = Board.new(rng, size)
+                        started_at = time.time()
+                        outcomes = engine.analyze(engine.to_board(mat))
+                        history.reset(engine.to_board(mat))
+                        game_over = False
+                        used_undo = False
+                    elif event.key == pygame.K_s:
+                        screen = stats_screen
+                        break
+                    elif event.key == pygame.K_l:
+                        # Write any pending high score first so the player's
+                        # own rank is current.
+                        try:
+                            score_writer.flush()
+                        except sqlite3.Error as e:
+                            print(f"Error saving high scores: {e}")
+                        screen = leaderboard_screen
+                        break
+        if screen is not None:
+            # The screen waits for the player, so end the frame first and keep
+            # that reading time out of the event-handling figures.
+            profiler.end_frame()
+            quitting = screen(win, username) == "quit"
+            renderer.invalidate()
+            if not quitting:
+                profiler.begin_frame()
+        if quitting:
+            # Finished games were recorded when they ended; an abandoned one
+            # stays out of the statistics.
+            recorder.finish(score)
+            if profile_path:
+                # The events section is closed now, so the quit frame goes into
+                # the dump with its real event-handling time.
+                profiler.end_frame()
+                profiler.dump(profile_path)
+            pygame.quit()
+            sys.exit()
+        with profiler.section("draw_grid"):
+            renderer.draw(mat, score, high_score, game_over, username, hint_direction)
+        profiler.end_frame()
+        if profiler.enabled:
+            draw_profile_overlay(win, profiler)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="2048 Deep Version")
+    parser.add_argument("--profile", metavar="PATH", help="record frame timings, show them on screen and write them to PATH (.json or .csv) on exit")
+    parser.add_argument("--size", type=int, default=SIZE, choices=range(MIN_SIZE, MAX_SIZE + 1), metavar=f"{MIN_SIZE}-{MAX_SIZE}", help="board size")
+    parser.add_argument("--startup-time", action="store_true", help="print the cold-start time to the first menu frame and exit")
+    parser.add_argument("--history-kb", type=int, default=DEFAULT_MAX_BYTES // 1024, help="memory cap for undo history, in KiB")
+    args = parser.parse_args()
+    main(args.profile, args.size, args.startup_time, args.history_kb * 1024)
\ No newline at end of file
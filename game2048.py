@@ -1,88 +1,152 @@
+import atexit
+import os
 import sqlite3
 import bcrypt
 
-DB_NAME = 'high_scores.db'
+from game_stats import GameStats
+from leaderboard import Leaderboard
+from score_store import DB_NAME, ScoreStore
+from write_behind import GameRecordWriter, HighScoreWriter
 
-def get_connection():
-    """Create and return a new SQLite connection to the database."""
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 31
+
+def parse_bcrypt_rounds(value):
+    """Parse a bcrypt cost factor, rejecting values outside the 4-31 range bcrypt accepts."""
+    message = f"GAME2048_BCRYPT_ROUNDS must be a whole number from {MIN_BCRYPT_ROUNDS} to {MAX_BCRYPT_ROUNDS}, not {value!r}"
     try:
-        conn = sqlite3.connect(DB_NAME)
-        return conn
-    except sqlite3.Error as e:
-        print(f"Error connecting to the database: {e}")
-        return None
+        rounds = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(message) from None
+    if not MIN_BCRYPT_ROUNDS <= rounds <= MAX_BCRYPT_ROUNDS:
+        raise ValueError(message)
+    return rounds
+
+BCRYPT_ROUNDS = parse_bcrypt_rounds(os.environ.get("GAME2048_BCRYPT_ROUNDS", 12))
+
+_store = None
+_writer = None
+_leaderboard = None
+_stats = None
+_stats_writer = None
+
+
+def get_store():
+    """Return the shared ScoreStore, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = ScoreStore(DB_NAME)
+    return _store
+
+def configure_store(db_name=DB_NAME, **options):
+    """Replace the shared ScoreStore, e.g. to point at another database file."""
+    global _store, _writer, _leaderboard, _stats, _stats_writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if _stats_writer is not None:
+        _stats_writer.close()
+        _stats_writer = None
+    _leaderboard = None
+    _stats = None
+    if _store is not None:
+        _store.close()
+    _store = ScoreStore(db_name, **options)
+    return _store
+
+def get_score_writer():
+    """Return the shared write-behind queue for high scores; it is flushed at exit."""
+    global _writer
+    if _writer is None:
+        _writer = HighScoreWriter(get_store())
+        atexit.register(_writer.close)
+    return _writer
+
+def get_leaderboard():
+    """Return the shared cached Leaderboard over the score store."""
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard(get_store())
+    return _leaderboard
+
+def get_stats():
+    """Return the shared per-user game statistics over the score store."""
+    global _stats
+    if _stats is None:
+        _stats = GameStats(get_store())
+    return _stats
+
+def get_stats_writer():
+    """Return the shared write-behind queue for finished-game records; it is flushed at exit."""
+    global _stats_writer
+    if _stats_writer is None:
+        _stats_writer = GameRecordWriter(get_stats())
+        atexit.register(_stats_writer.close)
+    return _stats_writer
 
 def create_table():
-    """Initialize the database with the necessary table."""
-    conn = get_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-                                username TEXT PRIMARY KEY,
-                                password TEXT,
-                                high_score INTEGER DEFAULT 0
-                              )''')
-            conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error creating table: {e}")
-        finally:
-            conn.close()
+    """Initialize the database with the necessary tables."""
+    try:
+        get_store().create_table()
+        get_stats().create_tables()
+    except sqlite3.Error as e:
+        print(f"Error creating table: {e}")
+
+def hash_rounds(hashed_password):
+    """Return the bcrypt cost factor stored in a hash such as b"$2b$12$..."."""
+    try:
+        return int(hashed_password.split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
 
 def signup(username, password):
     """Sign up a new user with a hashed password."""
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        try:
-            cursor.execute("INSERT INTO users (username, password, high_score) VALUES (?, ?, ?)", 
-                           (username, hashed_password, 0))
-            conn.commit()
+    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS))
+    try:
+        if get_store().add_user(username, hashed_password):
             return True, "Signup successful!"
-        except sqlite3.IntegrityError:
-            return False, "Username already exists. Please choose a different username."
-        finally:
-            conn.close()
-    else:
+        return False, "Username already exists. Please choose a different username."
+    except sqlite3.Error:
         return False, "Database connection error."
 
 def login(username, password):
     """Log in an existing user by checking their password."""
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-        result = cursor.fetchone()
-        conn.close()
-        if result and bcrypt.checkpw(password.encode(), result[0]):
-            return True, "Login successful!"
-        else:
-            return False, "Invalid username or password."
-    else:
+    try:
+        hashed_password = get_store().get_password(username)
+    except sqlite3.Error:
         return False, "Database connection error."
+    if hashed_password and bcrypt.checkpw(password.encode(), hashed_password):
+        if hash_rounds(hashed_password) != BCRYPT_ROUNDS:
+            # The cost factor changed since this hash was made; upgrade it now
+            # that we have the plain password.
+            try:
+                get_store().set_password(username, bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)))
+            except sqlite3.Error as e:
+                print(f"Error updating password hash: {e}")
+        return True, "Login successful!"
+    else:
+        return False, "Invalid username or password."
 
 def get_high_score(username):
     """Retrieve the high score for the specified user."""
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT high_score FROM users WHERE username = ?", (username,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 0
-    else:
+    try:
+        return get_store().get_high_score(username)
+    except sqlite3.Error:
         print("Database connection error.")
         return 0
 
+def get_user_stats(username):
+    """Write any pending game records, then return the user's statistics summary (None if no games)."""
+    try:
+        get_stats_writer().flush()
+        return get_stats().summary(username)
+    except sqlite3.Error:
+        print("Database connection error.")
+        return None
+
 def save_high_score(username, score):
     """Update the high score for the user if the new score is higher."""
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("UPDATE users SET high_score = ? WHERE username = ? AND high_score < ?", 
-                       (score, username, score))
-        conn.commit()
-        conn.close()
-    else:
+    try:
+        get_store().save_high_score(username, score)
+    except sqlite3.Error:
         print("Database connection error.")
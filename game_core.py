@@ -0,0 +1,332 @@
+"""Headless 2048 game logic.
+
+Nothing here touches pygame, so simulations, bots and worker processes can
+import it without a display or sound device.  Swipes report merges by
+appending MergeEvent tuples to an optional ``events`` list; the UI decides
+what to do with them (e.g. play a sound).
+"""
+import random
+from collections import namedtuple
+
+SIZE = 5
+MIN_SIZE = 3
+MAX_SIZE = 8
+
+LEFT, RIGHT, UP, DOWN = range(4)
+DIRECTIONS = (LEFT, RIGHT, UP, DOWN)
+
+MergeEvent = namedtuple("MergeEvent", ["row", "col", "value"])
+
+
+def check_size(size):
+    if not MIN_SIZE <= size <= MAX_SIZE:
+        raise ValueError(f"Board size must be between {MIN_SIZE} and {MAX_SIZE}")
+
+
+_lines_cache = {}
+
+
+def _lines(size):
+    """Cells of every line in the order tiles slide, per direction, for a board size."""
+    lines = _lines_cache.get(size)
+    if lines is None:
+        lines = _lines_cache[size] = (
+            [[(i, j) for j in range(size)] for i in range(size)],
+            [[(i, j) for j in reversed(range(size))] for i in range(size)],
+            [[(i, j) for i in range(size)] for j in range(size)],
+            [[(i, j) for i in reversed(range(size))] for j in range(size)],
+        )
+    return lines
+
+
+# Slide results per line, keyed by the line's values in sliding order and
+# filled on first use like bitboard's row tables.  An entry is
+# (merged values, score, merge indices, cells freed), or () if the line
+# cannot move.  The table is emptied when it fills, which keeps long runs
+# bounded while the lines of the current games are quickly relearned.
+LINE_CACHE_SIZE = 1 << 16
+_line_moves = {}
+
+
+def _line_move(values):
+    if len(_line_moves) >= LINE_CACHE_SIZE:
+        _line_moves.clear()
+    merged_at = []
+    tiles = [v for v in values if v]
+    merged, gained = merge_tiles(tiles, merged_at)
+    freed = len(tiles) - len(merged)
+    merged = tuple(merged) + (0,) * (len(values) - len(merged))
+    entry = _line_moves[values] = (merged, gained, tuple(merged_at), freed) if merged != values else ()
+    return entry
+
+
+# Per byte of the free-cell mask: its number of set bits, and the bit index
+# of each of them in order, so spawn() finds the k-th empty cell a byte at a
+# time instead of a cell at a time.
+_BYTE_COUNTS = [bin(byte).count("1") for byte in range(256)]
+_BYTE_SELECT = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+
+
+class Board(list):
+    """A mat that keeps its empty cells and merge status up to date.
+
+    Board is a list of row lists, so ``mat[i][j]`` reads and the module
+    functions work unchanged; add_new and is_game_over use the tracked state
+    instead of rescanning the grid.  Change cells through set(), move() and
+    spawn() only, since writing to a row directly bypasses the bookkeeping.
+    """
+
+    def __init__(self, rows=None, size=SIZE):
+        if rows is not None:
+            size = len(rows)
+        check_size(size)
+        super().__init__([0] * size for _ in range(size))
+        self.size = size
+        self._lines = _lines(size)
+        # Bit i * size + j is set while cell (i, j) is empty, so bit order is
+        # the row-major order add_new scans the mat in.
+        self._free = (1 << size * size) - 1
+        self._free_count = size * size
+        self._can_merge = False
+        if rows is not None:
+            for i in range(size):
+                for j in range(size):
+                    self.set(i, j, rows[i][j])
+
+    @classmethod
+    def new(cls, rng=random, size=SIZE):
+        board = cls(size=size)
+        board.spawn(rng)
+        board.spawn(rng)
+        return board
+
+    def copy(self):
+        board = Board.__new__(Board)
+        list.__init__(board, (row[:] for row in self))
+        board.size = self.size
+        board._lines = self._lines
+        board._free = self._free
+        board._free_count = self._free_count
+        board._can_merge = self._can_merge
+        return board
+
+    def _fill(self, i, j):
+        self._free &= ~(1 << (i * self.size + j))
+        self._free_count -= 1
+
+    def _clear(self, i, j):
+        self._free |= 1 << (i * self.size + j)
+        self._free_count += 1
+
+    def set(self, i, j, value):
+        row = self[i]
+        old = row[j]
+        if old == value:
+            return
+        row[j] = value
+        self._can_merge = None
+        if not old:
+            self._fill(i, j)
+        elif not value:
+            self._clear(i, j)
+
+    def move(self, direction, events=None):
+        """Swipe in place like swipe_*, updating only the cells that change."""
+        score = 0
+        size = self.size
+        # Read every line in sliding order at C speed instead of cell by cell.
+        if direction == LEFT:
+            lines = map(tuple, self)
+        elif direction == RIGHT:
+            lines = (tuple(reversed(row)) for row in self)
+        elif direction == UP:
+            lines = zip(*self)
+        else:
+            lines = zip(*reversed(self))
+        for cells, values in zip(self._lines[direction], lines):
+            entry = _line_moves.get(values)
+            if entry is None:
+                entry = _line_move(values)
+            if not entry:
+                continue
+            merged, gained, merged_at, freed = entry
+            free = self._free
+            for (i, j), old, new in zip(cells, values, merged):
+                if old != new:
+                    self[i][j] = new
+                    if not old or not new:
+                        free ^= 1 << (i * size + j)
+            self._free = free
+            self._free_count += freed
+            self._can_merge = None
+            score += gained
+            if events is not None and merged_at:
+                events.extend(MergeEvent(*cells[k], merged[k]) for k in merged_at)
+        return score
+
+    def spawn(self, rng=random):
+        if self._free_count:
+            # choice() over a range draws exactly like add_new's choice() over
+            # its list of empty cells, so a seeded Board and a seeded mat
+            # spawn the same tiles in the same places.  Finding the k-th
+            # empty cell takes at most one step per byte of the mask.
+            k = rng.choice(range(self._free_count))
+            free = self._free
+            offset = 0
+            while True:
+                byte = free & 0xFF
+                count = _BYTE_COUNTS[byte]
+                if k < count:
+                    break
+                k -= count
+                free >>= 8
+                offset += 8
+            i, j = divmod(offset + _BYTE_SELECT[byte][k], self.size)
+            self.set(i, j, rng.choice([2, 4]))
+
+    def empty_cells(self):
+        free = self._free
+        return [divmod(k, self.size) for k in range(self.size * self.size) if free >> k & 1]
+
+    def can_merge(self):
+        """Whether two equal tiles touch; cached until a cell changes."""
+        if self._can_merge is None:
+            last = self.size - 1
+            self._can_merge = any(
+                row[j] and (row[j] == row[j + 1] or (i < last and row[j] == self[i + 1][j]))
+                for i, row in enumerate(self) for j in range(last)
+            ) or any(self[i][last] and self[i][last] == self[i + 1][last] for i in range(last))
+        return self._can_merge
+
+    def is_game_over(self):
+        # A free cell settles it in O(1); the merge scan only runs on a full board.
+        return not self._free and not self.can_merge()
+
+
+def start_game(rng=random, size=SIZE):
+    check_size(size)
+    mat = [[0] * size for _ in range(size)]
+    add_new(mat, rng)
+    add_new(mat, rng)
+    return mat
+
+
+def add_new(mat, rng=random):
+    if isinstance(mat, Board):
+        mat.spawn(rng)
+        return
+    size = len(mat)
+    empty_cells = [(i, j) for i in range(size) for j in range(size) if mat[i][j] == 0]
+    if empty_cells:
+        i, j = rng.choice(empty_cells)
+        mat[i][j] = rng.choice([2, 4])
+
+
+def merge_tiles(tiles, merged_at=None):
+    """Merge a compacted line of tiles towards index 0.
+
+    If merged_at is a list, the output index of every merge is appended to it.
+    """
+    score = 0
+    merged = []
+    skip = False
+    for i in range(len(tiles)):
+        if skip:
+            skip = False
+            continue
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+            if merged_at is not None:
+                merged_at.append(len(merged))
+            merged.append(tiles[i] * 2)
+            score += tiles[i] * 2
+            skip = True
+        else:
+            merged.append(tiles[i])
+    return merged, score
+
+
+def swipe_left(mat, events=None):
+    if isinstance(mat, Board):
+        return mat.move(LEFT, events)
+    size = len(mat)
+    score = 0
+    for i in range(size):
+        new_row = [num for num in mat[i] if num != 0]
+        merged_at = [] if events is not None else None
+        new_row, merges = merge_tiles(new_row, merged_at)
+        mat[i] = new_row + [0] * (size - len(new_row))
+        score += merges
+        if merged_at:
+            events.extend(MergeEvent(i, k, mat[i][k]) for k in merged_at)
+    return score
+
+
+def swipe_right(mat, events=None):
+    if isinstance(mat, Board):
+        return mat.move(RIGHT, events)
+    size = len(mat)
+    score = 0
+    for i in range(size):
+        new_row = [num for num in mat[i] if num != 0]
+        new_row.reverse()
+        merged_at = [] if events is not None else None
+        new_row, merges = merge_tiles(new_row, merged_at)
+        mat[i] = [0] * (size - len(new_row)) + new_row[::-1]
+        score += merges
+        if merged_at:
+            events.extend(MergeEvent(i, size - 1 - k, new_row[k]) for k in merged_at)
+    return score
+
+
+def swipe_up(mat, events=None):
+    if isinstance(mat, Board):
+        return mat.move(UP, events)
+    size = len(mat)
+    score = 0
+    for j in range(size):
+        new_col = [mat[i][j] for i in range(size) if mat[i][j] != 0]
+        merged_at = [] if events is not None else None
+        new_col, merges = merge_tiles(new_col, merged_at)
+        for i in range(size):
+            mat[i][j] = new_col[i] if i < len(new_col) else 0
+        score += merges
+        if merged_at:
+            events.extend(MergeEvent(k, j, new_col[k]) for k in merged_at)
+    return score
+
+
+def swipe_down(mat, events=None):
+    if isinstance(mat, Board):
+        return mat.move(DOWN, events)
+    size = len(mat)
+    score = 0
+    for j in range(size):
+        new_col = [mat[i][j] for i in range(size) if mat[i][j] != 0]
+        new_col.reverse()
+        merged_at = [] if events is not None else None
+        new_col, merges = merge_tiles(new_col, merged_at)
+        if merged_at:
+            events.extend(MergeEvent(size - 1 - k, j, new_col[k]) for k in merged_at)
+        new_col = [0] * (size - len(new_col)) + new_col[::-1]
+        for i in range(size):
+            mat[i][j] = new_col[i]
+        score += merges
+    return score
+
+
+SWIPES = (swipe_left, swipe_right, swipe_up, swipe_down)
+
+
+def swipe(mat, direction, events=None):
+    return SWIPES[direction](mat, events)
+
+
+def is_game_over(mat):
+    if isinstance(mat, Board):
+        return mat.is_game_over()
+    size = len(mat)
+    for i in range(size):
+        for j in range(size):
+            if mat[i][j] == 0 or (j < size - 1 and mat[i][j] == mat[i][j + 1]) or (i < size - 1 and mat[i][j] == mat[i + 1][j]):
+                return False
+    return True
@@ -0,0 +1,201 @@
+"""Per-game history and per-user aggregates, next to the users table.
+
+Every finished game is a row in ``games``.  The aggregates a stats screen
+needs (totals for averages, the best-tile distribution, games per day) live
+in their own small tables and are updated in the same transaction as the
+insert, so reading them never scans the history.  record_games() takes a
+whole batch: rows go in with executemany and each aggregate row is touched
+once per batch, however many of its games are in it.
+
+Usage:
+    python game_stats.py                    # every user, read-only
+    python game_stats.py --user alice --days 14
+"""
+import argparse
+import sqlite3
+import time
+from collections import Counter, namedtuple
+
+from score_store import DB_NAME
+
+CREATE_GAMES = '''CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    max_tile INTEGER NOT NULL,
+                    moves INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    played_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                  )'''
+CREATE_GAMES_INDEX = "CREATE INDEX IF NOT EXISTS idx_games_user_played ON games (username, played_at)"
+CREATE_USER_STATS = '''CREATE TABLE IF NOT EXISTS user_stats (
+                         username TEXT PRIMARY KEY,
+                         games INTEGER NOT NULL,
+                         total_score INTEGER NOT NULL,
+                         best_score INTEGER NOT NULL,
+                         total_moves INTEGER NOT NULL,
+                         total_duration REAL NOT NULL,
+                         first_played REAL NOT NULL,
+                         last_played REAL NOT NULL
+                       )'''
+CREATE_TILE_COUNTS = '''CREATE TABLE IF NOT EXISTS user_tile_counts (
+                          username TEXT NOT NULL,
+                          max_tile INTEGER NOT NULL,
+                          games INTEGER NOT NULL,
+                          PRIMARY KEY (username, max_tile)
+                        ) WITHOUT ROWID'''
+CREATE_DAILY_GAMES = '''CREATE TABLE IF NOT EXISTS user_daily_games (
+                          username TEXT NOT NULL,
+                          day TEXT NOT NULL,
+                          games INTEGER NOT NULL,
+                          PRIMARY KEY (username, day)
+                        ) WITHOUT ROWID'''
+INSERT_GAME = '''INSERT INTO games (username, score, max_tile, moves, duration, played_at, size)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)'''
+UPSERT_USER_STATS = '''INSERT INTO user_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (username) DO UPDATE SET
+                         games = games + excluded.games,
+                         total_score = total_score + excluded.total_score,
+                         best_score = MAX(best_score, excluded.best_score),
+                         total_moves = total_moves + excluded.total_moves,
+                         total_duration = total_duration + excluded.total_duration,
+                         first_played = MIN(first_played, excluded.first_played),
+                         last_played = MAX(last_played, excluded.last_played)'''
+UPSERT_TILE_COUNT = '''INSERT INTO user_tile_counts VALUES (?, ?, ?)
+                       ON CONFLICT (username, max_tile) DO UPDATE SET games = games + excluded.games'''
+UPSERT_DAILY_GAMES = '''INSERT INTO user_daily_games VALUES (?, ?, ?)
+                        ON CONFLICT (username, day) DO UPDATE SET games = games + excluded.games'''
+SELECT_USER_STATS = "SELECT * FROM user_stats WHERE username = ?"
+SELECT_ALL_USER_STATS = "SELECT * FROM user_stats ORDER BY games DESC, username"
+SELECT_TILE_COUNTS = "SELECT max_tile, games FROM user_tile_counts WHERE username = ? ORDER BY max_tile DESC"
+SELECT_DAILY_GAMES = '''SELECT day, games FROM user_daily_games
+                        WHERE username = ? AND day >= ? ORDER BY day DESC'''
+
+GameRecord = namedtuple("GameRecord", ["username", "score", "max_tile", "moves", "duration", "played_at", "size"])
+UserStats = namedtuple("UserStats", ["username", "games", "total_score", "best_score", "total_moves",
+                                     "total_duration", "first_played", "last_played"])
+
+
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def create_tables(conn):
+    for statement in (CREATE_GAMES, CREATE_GAMES_INDEX, CREATE_USER_STATS, CREATE_TILE_COUNTS, CREATE_DAILY_GAMES):
+        conn.execute(statement)
+
+
+def insert_games(conn, records):
+    """Insert a batch of GameRecords and fold them into the aggregate tables."""
+    totals = {}
+    tiles = Counter()
+    days = Counter()
+    for record in records:
+        entry = totals.get(record.username)
+        if entry is None:
+            totals[record.username] = [record.username, 1, record.score, record.score, record.moves,
+                                       record.duration, record.played_at, record.played_at]
+        else:
+            entry[1] += 1
+            entry[2] += record.score
+            entry[3] = max(entry[3], record.score)
+            entry[4] += record.moves
+            entry[5] += record.duration
+            entry[6] = min(entry[6], record.played_at)
+            entry[7] = max(entry[7], record.played_at)
+        tiles[record.username, record.max_tile] += 1
+        days[record.username, day_of(record.played_at)] += 1
+    conn.executemany(INSERT_GAME, records)
+    conn.executemany(UPSERT_USER_STATS, list(totals.values()))
+    conn.executemany(UPSERT_TILE_COUNT, [(username, tile, n) for (username, tile), n in tiles.items()])
+    conn.executemany(UPSERT_DAILY_GAMES, [(username, day, n) for (username, day), n in days.items()])
+
+
+def user_summary(conn, username, days=7):
+    """Return a dict of a user's aggregates, or None if they have no games recorded."""
+    row = conn.execute(SELECT_USER_STATS, (username,)).fetchone()
+    if row is None:
+        return None
+    stats = UserStats(*row)
+    since = day_of(time.time() - (days - 1) * 86400)
+    return {
+        "games": stats.games,
+        "average_score": stats.total_score / stats.games,
+        "best_score": stats.best_score,
+        "average_moves": stats.total_moves / stats.games,
+        "average_duration": stats.total_duration / stats.games,
+        "first_played": stats.first_played,
+        "last_played": stats.last_played,
+        "best_tiles": conn.execute(SELECT_TILE_COUNTS, (username,)).fetchall(),
+        "games_per_day": conn.execute(SELECT_DAILY_GAMES, (username, since)).fetchall(),
+    }
+
+
+class GameStats:
+    def __init__(self, store):
+        self.store = store
+
+    def create_tables(self):
+        with self.store.connection() as conn:
+            create_tables(conn)
+
+    def record_games(self, records):
+        if not records:
+            return
+        with self.store.connection() as conn:
+            insert_games(conn, records)
+
+    def record_game(self, record):
+        self.record_games([record])
+
+    def summary(self, username, days=7):
+        with self.store.connection() as conn:
+            return user_summary(conn, username, days)
+
+
+def connect_readonly(db_name=DB_NAME):
+    """Open the database for reporting without taking write locks or creating files."""
+    conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-user 2048 statistics.")
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--user", help="show one user in detail")
+    parser.add_argument("--days", type=int, default=7, help="days of games-per-day history to show")
+    args = parser.parse_args(argv)
+
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        parser.exit(1, f"Cannot open {args.db}: {e}\n")
+    try:
+        if args.user:
+            summary = user_summary(conn, args.user, args.days)
+            if summary is None:
+                print(f"No games recorded for {args.user}")
+                return
+            print(f"{args.user}: {summary['games']} games, best {summary['best_score']}, "
+                  f"average {summary['average_score']:.0f} over {summary['average_moves']:.0f} moves "
+                  f"and {summary['average_duration']:.0f}s")
+            print("best tile: " + ", ".join(f"{tile} x{n}" for tile, n in summary["best_tiles"]))
+            for day, n in summary["games_per_day"]:
+                print(f"  {day}  {n}")
+        else:
+            rows = conn.execute(SELECT_ALL_USER_STATS).fetchall()
+            print(f"{'user':<20} {'games':>6} {'best':>8} {'average':>9} {'last played':>12}")
+            for row in rows:
+                stats = UserStats(*row)
+                print(f"{stats.username:<20} {stats.games:>6} {stats.best_score:>8} "
+                      f"{stats.total_score / stats.games:>9.0f} {day_of(stats.last_played):>12}")
+    except sqlite3.OperationalError as e:
+        parser.exit(1, f"Cannot read statistics from {args.db}: {e}\n")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
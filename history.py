@@ -0,0 +1,98 @@
+"""Bounded undo/redo history of packed boards.
+
+Each state is one Python int: the bitboard of the position with the score
+packed above it.  Ints are immutable, so the undo and redo sides share the
+same objects and nothing is ever copied; a 5x5 state costs about 60 bytes
+where a deep-copied list-of-lists mat costs several hundred.  When the
+states exceed ``max_bytes`` the oldest ones are evicted, so long sessions
+keep a fixed-size window of recent moves; ``max_bytes=None`` keeps all.
+"""
+import sys
+from collections import deque
+
+import bitboard
+from game_core import SIZE
+
+DEFAULT_MAX_BYTES = 1 << 20
+SLOT_BYTES = 8  # the deque's pointer to each state
+
+
+class BoardHistory:
+    def __init__(self, size=SIZE, max_bytes=DEFAULT_MAX_BYTES):
+        self.engine = bitboard.get_engine(size)
+        self.board_bits = self.engine.cells * bitboard.CELL_BITS
+        self.board_mask = (1 << self.board_bits) - 1
+        self.max_bytes = max_bytes
+        self._states = deque()
+        self._cursor = -1
+        self.first_position = 0
+        self.nbytes = 0
+
+    def _pack(self, board, score):
+        return board | (score << self.board_bits)
+
+    def _unpack(self, state):
+        return state & self.board_mask, state >> self.board_bits
+
+    def _cost(self, state):
+        return sys.getsizeof(state) + SLOT_BYTES
+
+    def reset(self, board, score=0):
+        """Forget everything and start from a single state."""
+        self._states.clear()
+        self._cursor = -1
+        self.first_position = 0
+        self.nbytes = 0
+        self.push(board, score)
+
+    def push(self, board, score):
+        """Record the state after a move; any redo states are dropped."""
+        states = self._states
+        while len(states) > self._cursor + 1:
+            self.nbytes -= self._cost(states.pop())
+        state = self._pack(board, score)
+        states.append(state)
+        self.nbytes += self._cost(state)
+        self._cursor += 1
+        # Keep at least the current state, whatever the cap.
+        while self.max_bytes is not None and self.nbytes > self.max_bytes and self._cursor > 0:
+            self.nbytes -= self._cost(states.popleft())
+            self._cursor -= 1
+            self.first_position += 1
+
+    def current(self):
+        return self._unpack(self._states[self._cursor])
+
+    @property
+    def position(self):
+        """Moves played to reach the current state, counting evicted ones."""
+        return self.first_position + self._cursor
+
+    def can_undo(self):
+        return self._cursor > 0
+
+    def can_redo(self):
+        return self._cursor + 1 < len(self._states)
+
+    def undo(self):
+        """Step back one move and return its (board, score), or None at the oldest kept state."""
+        if not self.can_undo():
+            return None
+        self._cursor -= 1
+        return self.current()
+
+    def redo(self):
+        if not self.can_redo():
+            return None
+        self._cursor += 1
+        return self.current()
+
+    def __len__(self):
+        return len(self._states)
+
+    def __iter__(self):
+        """Yield (board, score) from the oldest kept state up to the current one."""
+        for k, state in enumerate(self._states):
+            if k > self._cursor:
+                break
+            yield self._unpack(state)
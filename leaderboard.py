@@ -0,0 +1,77 @@
+"""Leaderboard queries over the users table.
+
+Users are ranked by high_score descending, ties broken by username.  Every
+query walks the (high_score DESC, username) index instead of scanning the
+table, and answers are cached until the store reports a score change.
+"""
+
+SELECT_TOP = "SELECT username, high_score FROM users ORDER BY high_score DESC, username LIMIT ?"
+SELECT_USER_SCORE = "SELECT high_score FROM users WHERE username = ?"
+COUNT_AHEAD = "SELECT COUNT(*) FROM users WHERE high_score > ?"
+COUNT_AHEAD_TIED = "SELECT COUNT(*) FROM users WHERE high_score = ? AND username < ?"
+SELECT_ABOVE_TIED = "SELECT username, high_score FROM users WHERE high_score = ? AND username < ? ORDER BY username DESC LIMIT ?"
+SELECT_ABOVE = "SELECT username, high_score FROM users WHERE high_score > ? ORDER BY high_score, username DESC LIMIT ?"
+SELECT_BELOW_TIED = "SELECT username, high_score FROM users WHERE high_score = ? AND username > ? ORDER BY username LIMIT ?"
+SELECT_BELOW = "SELECT username, high_score FROM users WHERE high_score < ? ORDER BY high_score DESC, username LIMIT ?"
+
+
+class Leaderboard:
+    def __init__(self, store, cache_size=256):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache = {}
+        self._version = store.version
+
+    def _cached(self, key, compute):
+        if self._version != self.store.version:
+            self._cache.clear()
+            self._version = self.store.version
+        if key in self._cache:
+            return self._cache[key]
+        value = compute()
+        if len(self._cache) >= self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = value
+        return value
+
+    def top(self, n=10):
+        """Return [(rank, username, high_score)] for the best n users."""
+        def compute():
+            with self.store.connection() as conn:
+                rows = conn.execute(SELECT_TOP, (n,)).fetchall()
+            return [(rank, username, score) for rank, (username, score) in enumerate(rows, 1)]
+        return self._cached(("top", n), compute)
+
+    def _rank(self, conn, username):
+        row = conn.execute(SELECT_USER_SCORE, (username,)).fetchone()
+        if row is None:
+            return None, None
+        score = row[0]
+        ahead = conn.execute(COUNT_AHEAD, (score,)).fetchone()[0]
+        ahead += conn.execute(COUNT_AHEAD_TIED, (score, username)).fetchone()[0]
+        return ahead + 1, score
+
+    def rank(self, username):
+        """Return the 1-based rank of a user, or None if the user does not exist."""
+        def compute():
+            with self.store.connection() as conn:
+                return self._rank(conn, username)[0]
+        return self._cached(("rank", username), compute)
+
+    def around(self, username, radius=2):
+        """Return up to radius users on either side of username, with the user itself."""
+        def compute():
+            with self.store.connection() as conn:
+                rank, score = self._rank(conn, username)
+                if rank is None:
+                    return []
+                above = conn.execute(SELECT_ABOVE_TIED, (score, username, radius)).fetchall()
+                if len(above) < radius:
+                    above += conn.execute(SELECT_ABOVE, (score, radius - len(above))).fetchall()
+                below = conn.execute(SELECT_BELOW_TIED, (score, username, radius)).fetchall()
+                if len(below) < radius:
+                    below += conn.execute(SELECT_BELOW, (score, radius - len(below))).fetchall()
+            rows = above[::-1] + [(username, score)] + below
+            first = rank - len(above)
+            return [(first + k, name, value) for k, (name, value) in enumerate(rows)]
+        return self._cached(("around", username, radius), compute)
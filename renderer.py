@@ -0,0 +1,120 @@
+"""Dirty-rectangle renderer for the game screen.
+
+Tile surfaces (background, rounded tile and number) are rendered once per
+value and reused.  Each call to draw() compares the board and HUD text with
+what is already on screen, repaints only what changed and pushes just those
+rectangles with pygame.display.update().
+"""
+import pygame
+
+BOARD_TOP = 100
+BACKGROUND = (245, 245, 220)
+HUD_COLOR = (51, 0, 102)
+GAME_OVER_COLOR = (204, 0, 0)
+UNKNOWN_TILE_COLOR = (60, 58, 50)
+HINT_NAMES = ("Left", "Right", "Up", "Down")
+
+
+class GridRenderer:
+    def __init__(self, win, size, tile_size, padding, tile_colors, text_colors, tile_font, hud_font):
+        self.win = win
+        self.size = size
+        self.tile_size = tile_size
+        self.padding = padding
+        self.tile_colors = tile_colors
+        self.text_colors = text_colors
+        self.tile_font = tile_font
+        self.hud_font = hud_font
+        self._tiles = {}
+        self._cells = None
+        self._hud = {}
+        self._game_over = False
+
+    def invalidate(self):
+        """Force a full redraw on the next draw(), e.g. after another screen used the window."""
+        self._cells = None
+
+    def tile_surface(self, value):
+        surface = self._tiles.get(value)
+        if surface is None:
+            side = self.tile_size - self.padding
+            surface = pygame.Surface((side, side))
+            surface.fill(BACKGROUND)
+            color = self.tile_colors.get(value, UNKNOWN_TILE_COLOR)
+            pygame.draw.rect(surface, color, (0, 0, side, side), border_radius=8)
+            if value > 0:
+                text_color = self.text_colors.get(value, (255, 255, 255))
+                text = self.tile_font.render(str(value), True, text_color)
+                surface.blit(text, text.get_rect(center=(self.tile_size // 2, self.tile_size // 2 - self.padding)))
+            surface = surface.convert() if pygame.display.get_surface() else surface
+            self._tiles[value] = surface
+        return surface
+
+    def cell_rect(self, i, j):
+        side = self.tile_size - self.padding
+        return pygame.Rect(j * self.tile_size + self.padding, i * self.tile_size + self.padding + BOARD_TOP, side, side)
+
+    def _hud_fields(self, score, high_score, username, hint):
+        x = self.size * self.tile_size + 50
+        return {
+            "welcome": (f"Welcome, {username}!", (x, 100)),
+            "score": (f"Score: {score}", (x, 150)),
+            "high_score": (f"High Score: {high_score}", (x, 200)),
+            "hint": (f"Hint: {HINT_NAMES[hint]}" if hint is not None else "", (x, 250)),
+        }
+
+    def _draw_hud_field(self, name, text, pos):
+        previous = self._hud.get(name)
+        if previous and previous[0] == text:
+            return None
+        surface = self.hud_font.render(text, True, HUD_COLOR)
+        rect = surface.get_rect(topleft=pos)
+        dirty = rect.union(previous[1]) if previous else rect
+        self.win.fill(BACKGROUND, dirty)
+        self.win.blit(surface, rect)
+        self._hud[name] = (text, rect)
+        return dirty
+
+    def _draw_game_over(self, username):
+        center = self.size * self.tile_size // 2
+        lines = [
+            ("Game Over!", (center - 50, center), self.tile_font),
+            (f"Well played, {username}!", (center - 70, center + 40), self.hud_font),
+            ("Press R to Restart", (center - 50, center + 80), self.hud_font),
+        ]
+        for text, pos, font in lines:
+            self.win.blit(font.render(text, True, GAME_OVER_COLOR), pos)
+
+    def draw(self, mat, score, high_score, game_over, username, hint=None):
+        """Repaint what changed since the last call and return the updated rects."""
+        full = self._cells is None or game_over or game_over != self._game_over
+        if full:
+            self.win.fill(BACKGROUND)
+            self._cells = [[None] * self.size for _ in range(self.size)]
+            self._hud = {}
+        dirty = []
+        for i in range(self.size):
+            row = mat[i]
+            drawn = self._cells[i]
+            for j in range(self.size):
+                value = row[j]
+                if drawn[j] != value:
+                    rect = self.cell_rect(i, j)
+                    self.win.blit(self.tile_surface(value), rect)
+                    drawn[j] = value
+                    dirty.append(rect)
+        for name, (text, pos) in self._hud_fields(score, high_score, username, hint).items():
+            rect = self._draw_hud_field(name, text, pos)
+            if rect:
+                dirty.append(rect)
+        if game_over:
+            self._draw_game_over(username)
+            # Any change while the overlay is up repaints everything next time.
+            self._cells = None
+        self._game_over = game_over
+        if full:
+            pygame.display.flip()
+            return [self.win.get_rect()]
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
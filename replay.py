@@ -0,0 +1,200 @@
+"""Compact game replays and deterministic playback.
+
+A game is stored as its RNG seed plus the list of moves, packed four moves
+to a byte (2 bits each, the LEFT/RIGHT/UP/DOWN codes).  Playback re-drives
+Board.move and a seeded Board.spawn, exactly like the game loop, so the
+board after any move can be rebuilt.  A ReplayPlayer keeps a snapshot every
+few moves to make seeking cheap.
+
+Replay files are append-only: a short file header followed by records,
+each a fixed header and the packed moves.  encode_replay()/decode_replay()
+give the same record as bytes for a BLOB column.
+
+Usage:
+    python replay.py replays.bin            # list games and verify scores
+    python replay.py replays.bin --game 3 --move 120
+"""
+import argparse
+import os
+import random
+import struct
+from collections import namedtuple
+
+from game_core import SIZE, Board
+from history import BoardHistory
+
+FILE_MAGIC = b"R2048\x02"  # version 2: spawns pick the k-th empty cell in row-major order
+RECORD_MAGIC = b"GAME"
+RECORD_HEADER = struct.Struct("<4sQBII")  # magic, seed, board size, move count, final score
+SNAPSHOT_EVERY = 64
+
+Replay = namedtuple("Replay", ["seed", "moves", "score", "size"])
+
+
+def pack_moves(moves):
+    data = bytearray((len(moves) + 3) // 4)
+    for k, direction in enumerate(moves):
+        data[k >> 2] |= direction << ((k & 3) * 2)
+    return bytes(data)
+
+
+def unpack_moves(data, count):
+    return [(data[k >> 2] >> ((k & 3) * 2)) & 3 for k in range(count)]
+
+
+def encode_replay(replay):
+    header = RECORD_HEADER.pack(RECORD_MAGIC, replay.seed, replay.size, len(replay.moves), replay.score)
+    return header + pack_moves(replay.moves)
+
+
+def decode_replay(data, offset=0):
+    """Decode one record; return (Replay, offset just past it)."""
+    magic, seed, size, count, score = RECORD_HEADER.unpack_from(data, offset)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Bad replay record at offset {offset}")
+    start = offset + RECORD_HEADER.size
+    end = start + (count + 3) // 4
+    if end > len(data):
+        raise ValueError(f"Truncated replay record at offset {offset}")
+    return Replay(seed, unpack_moves(data[start:end], count), score, size), end
+
+
+def append_replay(path, replay):
+    with open(path, "ab") as f:
+        if f.tell() == 0:
+            f.write(FILE_MAGIC)
+        f.write(encode_replay(replay))
+
+
+def read_replays(path):
+    """Yield every Replay stored in a replay file, oldest first.
+
+    Records are read one at a time, so memory stays flat however many games
+    the file holds.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        offset = len(FILE_MAGIC)
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError(f"Truncated replay record at offset {offset}")
+            magic, seed, size, count, score = RECORD_HEADER.unpack(header)
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"Bad replay record at offset {offset}")
+            data = f.read((count + 3) // 4)
+            if len(data) < (count + 3) // 4:
+                raise ValueError(f"Truncated replay record at offset {offset}")
+            yield Replay(seed, unpack_moves(data, count), score, size)
+            offset += RECORD_HEADER.size + len(data)
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), "little")
+
+
+class ReplayRecorder:
+    """Records the game being played and appends it to a replay file when it ends."""
+
+    def __init__(self, path, size=SIZE):
+        self.path = path
+        self.size = size
+        self.seed = None
+        self.moves = []
+
+    def start(self, seed=None):
+        """Begin a new game and return the seeded RNG it must use for spawns."""
+        self.seed = new_seed() if seed is None else seed
+        self.moves = []
+        return random.Random(self.seed)
+
+    def record(self, direction):
+        self.moves.append(direction)
+
+    def cancel(self):
+        """Stop recording the current game without writing it."""
+        self.seed = None
+        self.moves = []
+
+    def finish(self, score):
+        if self.seed is None:
+            return None
+        replay = Replay(self.seed, self.moves, score, self.size)
+        append_replay(self.path, replay)
+        self.seed = None
+        self.moves = []
+        return replay
+
+
+class ReplayPlayer:
+    def __init__(self, replay, snapshot_every=SNAPSHOT_EVERY):
+        self.replay = replay
+        self.snapshot_every = snapshot_every
+        rng = random.Random(replay.seed)
+        board = Board.new(rng, replay.size)
+        # snapshots[k] is the state after k * snapshot_every moves.
+        self._snapshots = [(board, 0, rng.getstate())]
+
+    def board_at(self, n):
+        """Return (board, score) after the first n moves."""
+        n = min(n, len(self.replay.moves))
+        k = min(n // self.snapshot_every, len(self._snapshots) - 1)
+        board, score, state = self._snapshots[k]
+        board = board.copy()
+        rng = random.Random()
+        rng.setstate(state)
+        for index in range(k * self.snapshot_every, n):
+            score += board.move(self.replay.moves[index])
+            board.spawn(rng)
+            if (index + 1) % self.snapshot_every == 0 and (index + 1) // self.snapshot_every == len(self._snapshots):
+                self._snapshots.append((board.copy(), score, rng.getstate()))
+        return board, score
+
+    def final(self):
+        return self.board_at(len(self.replay.moves))
+
+    def verify(self):
+        """True if replaying the moves reproduces the recorded score."""
+        return self.final()[1] == self.replay.score
+
+    def history(self, max_bytes=None):
+        """Return a BoardHistory of every position in the game, e.g. to feed the solver."""
+        history = BoardHistory(self.replay.size, max_bytes)
+        engine = history.engine
+        board, score, state = self._snapshots[0]
+        board = board.copy()
+        rng = random.Random()
+        rng.setstate(state)
+        history.reset(engine.to_board(board), score)
+        for direction in self.replay.moves:
+            score += board.move(direction)
+            board.spawn(rng)
+            history.push(engine.to_board(board), score)
+        return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and verify 2048 replays.")
+    parser.add_argument("path")
+    parser.add_argument("--game", type=int, help="index of the game to show")
+    parser.add_argument("--move", type=int, help="show the board after this many moves")
+    args = parser.parse_args(argv)
+
+    for index, replay in enumerate(read_replays(args.path)):
+        if args.game is not None and index != args.game:
+            continue
+        player = ReplayPlayer(replay)
+        status = "ok" if player.verify() else "MISMATCH"
+        print(f"game {index}: {replay.size}x{replay.size}, seed {replay.seed}, {len(replay.moves)} moves, score {replay.score} [{status}]")
+        if args.game is not None:
+            board, score = player.board_at(len(replay.moves) if args.move is None else args.move)
+            for row in board:
+                print(" ".join(f"{value:>5}" for value in row))
+            print(f"score {score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Pooled SQLite access for users and high scores.
+
+A ScoreStore keeps a small pool of long-lived connections to the database
+instead of opening one per call.  Connections run in WAL mode so readers do
+not block the writer, and every statement is a module constant so the
+connection's statement cache prepares it once and reuses it.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_NAME = 'high_scores.db'
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+CREATE_USERS = '''CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT,
+                    high_score INTEGER DEFAULT 0
+                  )'''
+CREATE_HIGH_SCORE_INDEX = "CREATE INDEX IF NOT EXISTS idx_users_high_score ON users (high_score DESC, username)"
+INSERT_USER = "INSERT INTO users (username, password, high_score) VALUES (?, ?, 0)"
+SELECT_PASSWORD = "SELECT password FROM users WHERE username = ?"
+UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+SELECT_HIGH_SCORE = "SELECT high_score FROM users WHERE username = ?"
+UPDATE_HIGH_SCORE = "UPDATE users SET high_score = ? WHERE username = ? AND high_score < ?"
+
+
+class ScoreStore:
+    def __init__(self, db_name=DB_NAME, pool_size=2, synchronous="NORMAL", timeout=5.0):
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_MODES)}")
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self.synchronous = synchronous
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.version = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; commits on success, rolls back on error."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("ScoreStore is closed")
+        conn = None
+        with self._lock:
+            if self._pool.empty() and self._created < self.pool_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            conn = self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._pool.put(conn)
+            if closed:
+                # The store closed while this connection was borrowed.
+                conn.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._created = 0
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def create_table(self):
+        with self.connection() as conn:
+            conn.execute(CREATE_USERS)
+            conn.execute(CREATE_HIGH_SCORE_INDEX)
+
+    def _changed(self):
+        """Bump the version so caches built on the users table know to refresh."""
+        with self._lock:
+            self.version += 1
+
+    def add_user(self, username, hashed_password):
+        """Insert a new user; return False if the username is taken."""
+        try:
+            with self.connection() as conn:
+                conn.execute(INSERT_USER, (username, hashed_password))
+            self._changed()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def get_password(self, username):
+        with self.connection() as conn:
+            row = conn.execute(SELECT_PASSWORD, (username,)).fetchone()
+        return row[0] if row else None
+
+    def set_password(self, username, hashed_password):
+        with self.connection() as conn:
+            conn.execute(UPDATE_PASSWORD, (hashed_password, username))
+
+    def get_high_score(self, username):
+        with self.connection() as conn:
+            row = conn.execute(SELECT_HIGH_SCORE, (username,)).fetchone()
+        return row[0] if row else 0
+
+    def save_high_score(self, username, score):
+        with self.connection() as conn:
+            conn.execute(UPDATE_HIGH_SCORE, (score, username, score))
+        self._changed()
+
+    def save_high_scores(self, scores):
+        """Apply many {username: score} updates in a single transaction."""
+        with self.connection() as conn:
+            conn.executemany(UPDATE_HIGH_SCORE, [(score, username, score) for username, score in scores.items()])
+        self._changed()
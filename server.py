@@ -0,0 +1,308 @@
+"""Asyncio game server: many concurrent 2048 sessions over a line protocol.
+
+Every connection is a session whose board lives on the server as a packed
+bitboard int, so clients can only ask for moves and never send a board.
+Messages are single text lines:
+
+    client                      server
+    SIGNUP <user> <password>    OK <message> | ERR <message>
+    LOGIN <user> <password>     OK <high score> | ERR <message>
+    NEW [size]                  S <score> <high score> <over> <cells>
+    L | R | U | D               S ...   (the board is unchanged if the move was a no-op)
+    STATE                       S ...
+    QUIT                        BYE
+
+<cells> is one base-32 digit per cell, row-major, holding the tile's log2
+exponent (0 = empty), so a 5x5 board is 25 characters.  Sessions may play
+without logging in; their scores are simply not saved.
+
+bcrypt and SQLite calls run on worker threads (auth.py's pool and the
+default executor) and high scores go through the write-behind queue, so the
+event loop only ever does in-memory work.
+
+Usage:
+    python server.py --port 2048
+    python server.py --load 1000 --moves 200     # local server plus 1000 bot clients
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+
+import auth
+import bitboard
+import game2048
+from game_core import SIZE, LEFT, RIGHT, UP, DOWN, check_size
+
+DEFAULT_PORT = 2048
+MAX_LINE = 1024
+MAX_PASSWORD_BYTES = 72  # bcrypt refuses longer passwords
+MOVE_CODES = {"L": LEFT, "R": RIGHT, "U": UP, "D": DOWN}
+DIGITS = "0123456789abcdefghijklmnopqrstuv"
+
+
+def encode_cells(engine, board):
+    cells = []
+    for _ in range(engine.cells):
+        cells.append(DIGITS[board & bitboard.CELL_MASK])
+        board >>= bitboard.CELL_BITS
+    return "".join(cells)
+
+
+def decode_cells(cells):
+    """Turn a <cells> string back into a list-of-lists mat."""
+    size = int(len(cells) ** 0.5)
+    values = [1 << int(c, 32) if c != "0" else 0 for c in cells]
+    return [values[i * size:(i + 1) * size] for i in range(size)]
+
+
+class Session:
+    __slots__ = ("username", "high_score", "engine", "board", "score", "over")
+
+    def __init__(self):
+        self.username = None
+        self.high_score = 0
+        self.engine = None
+        self.board = 0
+        self.score = 0
+        self.over = False
+
+    def state(self):
+        if self.engine is None:
+            return "ERR No game; send NEW"
+        return f"S {self.score} {self.high_score} {int(self.over)} {encode_cells(self.engine, self.board)}"
+
+
+class GameServer:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, max_sessions=10000, idle_timeout=300.0, rng=None):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.rng = rng or random.Random()
+        self.sessions = 0
+        self.moves = 0
+        self.score_writer = game2048.get_score_writer()
+        self._server = None
+
+    async def start(self):
+        game2048.create_table()
+        self._server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_LINE)
+        # Port 0 asks the OS for a free port; report the one we got.
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.score_writer.request_flush()
+
+    async def handle(self, reader, writer):
+        if self.sessions >= self.max_sessions:
+            writer.write(b"ERR Server full\n")
+            await writer.drain()
+            writer.close()
+            return
+        self.sessions += 1
+        session = Session()
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                command = line.decode("utf-8", "replace").strip()
+                if command == "QUIT":
+                    writer.write(b"BYE\n")
+                    break
+                try:
+                    reply = await self.dispatch(session, command)
+                except (ValueError, sqlite3.Error) as e:
+                    # Never let bad input or a database hiccup drop the session
+                    # without telling the client why.
+                    reply = "ERR " + " ".join(str(e).split())
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            if session.username and session.over:
+                self.score_writer.request_flush()
+            writer.close()
+
+    async def dispatch(self, session, command):
+        name, _, args = command.partition(" ")
+        direction = MOVE_CODES.get(name)
+        if direction is not None:
+            return self.play(session, direction)
+        if name == "STATE":
+            return session.state()
+        if name == "NEW":
+            try:
+                size = int(args) if args else SIZE
+            except ValueError:
+                return "ERR Usage: NEW [size]"
+            try:
+                check_size(size)
+            except ValueError as e:
+                return f"ERR {e}"
+            session.engine = bitboard.get_engine(size)
+            session.board = session.engine.add_random_tile(session.engine.add_random_tile(0, self.rng), self.rng)
+            session.score = 0
+            session.over = False
+            return session.state()
+        if name in ("LOGIN", "SIGNUP"):
+            username, _, password = args.partition(" ")
+            if not username or not password:
+                return f"ERR Usage: {name} <user> <password>"
+            if len(password.encode()) > MAX_PASSWORD_BYTES:
+                return f"ERR Password must be at most {MAX_PASSWORD_BYTES} bytes"
+            submit = auth.submit_login if name == "LOGIN" else auth.submit_signup
+            success, message = await asyncio.wrap_future(submit(username, password))
+            if not success:
+                return f"ERR {message}"
+            if name == "SIGNUP":
+                return f"OK {message}"
+            loop = asyncio.get_running_loop()
+            session.username = username
+            session.high_score = await loop.run_in_executor(None, game2048.get_high_score, username)
+            return f"OK {session.high_score}"
+        return f"ERR Unknown command: {name}"
+
+    def play(self, session, direction):
+        engine = session.engine
+        if engine is None:
+            return "ERR No game; send NEW"
+        if session.over:
+            return session.state()
+        moved, gained, legal = engine.analyze(session.board)[direction]
+        if legal:
+            session.board = engine.add_random_tile(moved, self.rng)
+            session.score += gained
+            session.over = not any(result.legal for result in engine.analyze(session.board))
+            self.moves += 1
+            if session.username and session.score > session.high_score:
+                session.high_score = session.score
+                # submit() only updates a dict under a lock; the disk write
+                # happens on the writer's thread.
+                self.score_writer.submit(session.username, session.score)
+        return session.state()
+
+
+class GameClient:
+    """Minimal asyncio client for the server protocol."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, line):
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        reply = (await self.reader.readline()).decode().rstrip("\n")
+        if not reply:
+            raise ConnectionError("Server closed the connection")
+        return reply
+
+    async def _ok(self, line):
+        reply = await self.request(line)
+        status, _, message = reply.partition(" ")
+        if status != "OK":
+            raise ValueError(message)
+        return message
+
+    async def signup(self, username, password):
+        return await self._ok(f"SIGNUP {username} {password}")
+
+    async def login(self, username, password):
+        return int(await self._ok(f"LOGIN {username} {password}"))
+
+    async def _state(self, line):
+        reply = await self.request(line)
+        if not reply.startswith("S "):
+            raise ValueError(reply.partition(" ")[2])
+        _, score, high_score, over, cells = reply.split(" ")
+        return int(score), int(high_score), over == "1", decode_cells(cells)
+
+    async def new_game(self, size=SIZE):
+        """Start a game; returns (score, high_score, over, mat) like every move."""
+        return await self._state(f"NEW {size}")
+
+    async def move(self, direction):
+        return await self._state("LRUD"[direction])
+
+    async def close(self):
+        self.writer.write(b"QUIT\n")
+        await self.writer.drain()
+        await self.reader.readline()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_bot(port, moves, size, rng):
+    client = await GameClient.connect(port=port)
+    try:
+        await client.new_game(size)
+        for _ in range(moves):
+            over = (await client.move(rng.randrange(4)))[2]
+            if over:
+                await client.new_game(size)
+    finally:
+        await client.close()
+
+
+async def run_load(clients, moves, size, seed):
+    server = GameServer(port=0, max_sessions=clients)
+    await server.start()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    await asyncio.gather(*(run_bot(server.port, moves, size, random.Random(rng.random())) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    await server.close()
+    requests = clients * moves
+    print(f"{clients} clients, {requests} requests in {elapsed:.2f}s "
+          f"({requests / elapsed:,.0f} req/s, {server.moves} board changes)")
+
+
+async def serve(host, port, max_sessions):
+    server = GameServer(host, port, max_sessions)
+    async with await server.start():
+        print(f"Serving 2048 on {host}:{server.port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve 2048 sessions over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--load", type=int, metavar="CLIENTS", help="run a local server against this many bot clients")
+    parser.add_argument("--moves", type=int, default=100, help="moves per bot client")
+    parser.add_argument("--size", type=int, default=SIZE, help="board size for bot clients")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.load:
+            asyncio.run(run_load(args.load, args.moves, args.size, args.seed))
+        else:
+            asyncio.run(serve(args.host, args.port, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Expectimax player for the 2048 board.
+
+The search works on packed bitboards and averages over every 2/4 spawn that
+add_new can produce.  Results are kept in a bounded transposition table
+keyed by the board int, and each move is searched with iterative deepening
+until the per-move time budget runs out.
+
+Usage:
+    python solver.py --games 3 --time 0.05 --seed 1
+"""
+import argparse
+import random
+import time
+from collections import OrderedDict
+
+import bitboard
+from bitboard import CELL_BITS, CELL_MASK, MAX_EXPONENT, ROW_TABLE_SIZE
+from game_core import SIZE, MAX_SIZE, start_game, add_new, swipe, is_game_over
+
+SPAWNS = ((1, 0.5), (2, 0.5))  # (exponent, probability) of add_new's 2 and 4
+MIN_PROBABILITY = 1e-3
+
+EMPTY_WEIGHT = 270.0
+MERGE_WEIGHT = 700.0
+MONOTONIC_WEIGHT = 47.0
+SUM_WEIGHT = 11.0
+SUM_POWER = 3.5
+MONOTONIC_POWER = 4.0
+
+# evaluate() never goes below this: every line of the largest board full of
+# the largest tiles, as far from monotonic as a line can be.  A dead board
+# scores LOST_VALUE, just under it, so it ranks below every live board.
+MIN_EVALUATION = -2 * MAX_SIZE * (MONOTONIC_WEIGHT * (MAX_SIZE - 1) * MAX_EXPONENT ** MONOTONIC_POWER
+                                  + SUM_WEIGHT * MAX_SIZE * MAX_EXPONENT ** SUM_POWER)
+LOST_VALUE = MIN_EVALUATION - 1.0
+
+# One heuristic cache per board size, keyed by packed row.  Like the
+# engine's row tables, each is emptied once it holds ROW_TABLE_SIZE rows.
+_row_scores = {}
+
+
+def _row_score(row, size, scores):
+    score = scores.get(row)
+    if score is not None:
+        return score
+    cells = [(row >> (k * CELL_BITS)) & CELL_MASK for k in range(size)]
+    empty = cells.count(0)
+    merges = 0
+    previous = 0
+    counter = 0
+    for exponent in cells:
+        if not exponent:
+            continue
+        if exponent == previous:
+            counter += 1
+        elif counter:
+            merges += 1 + counter
+            counter = 0
+        previous = exponent
+    if counter:
+        merges += 1 + counter
+    left = right = 0.0
+    for a, b in zip(cells, cells[1:]):
+        if a > b:
+            left += a ** MONOTONIC_POWER - b ** MONOTONIC_POWER
+        else:
+            right += b ** MONOTONIC_POWER - a ** MONOTONIC_POWER
+    score = (EMPTY_WEIGHT * empty + MERGE_WEIGHT * merges
+             - MONOTONIC_WEIGHT * min(left, right)
+             - SUM_WEIGHT * sum(e ** SUM_POWER for e in cells))
+    if len(scores) >= ROW_TABLE_SIZE:
+        scores.clear()
+    scores[row] = score
+    return score
+
+
+def evaluate(board, engine=bitboard.get_engine()):
+    """Static heuristic: empty cells, merge chances, monotonic rows and columns."""
+    scores = _row_scores.setdefault(engine.size, {})
+    total = 0.0
+    for packed in (board, engine.transpose(board)):
+        for shift in engine.row_shifts:
+            total += _row_score((packed >> shift) & engine.row_mask, engine.size, scores)
+    return total
+
+
+def hint(board, engine=bitboard.get_engine()):
+    """Quick one-ply suggestion for a board int: the legal move with the best heuristic.
+
+    Returns None when no move is legal.  Costs one cached analyze() call
+    plus at most four evaluations, so it is cheap enough for every keypress.
+    """
+    best = None
+    best_value = None
+    for direction, (moved, gained, legal) in enumerate(engine.analyze(board)):
+        if legal:
+            value = evaluate(moved, engine) + gained
+            if best is None or value > best_value:
+                best, best_value = direction, value
+    return best
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class ExpectimaxSolver:
+    def __init__(self, time_budget=0.05, max_depth=6, table_size=200000, size=SIZE):
+        self.engine = bitboard.get_engine(size)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self.deadline = None
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def _lookup(self, board, depth):
+        entry = self.table.get(board)
+        if entry is not None and entry[0] >= depth:
+            self.table.move_to_end(board)
+            return entry[1]
+        return None
+
+    def _store(self, board, depth, value):
+        self.table[board] = (depth, value)
+        self.table.move_to_end(board)
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+
+    def _max_node(self, board, depth, probability):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        best = None
+        for moved, _, legal in self.engine.analyze(board):
+            if not legal:
+                continue
+            value = self._chance_node(moved, depth, probability)
+            if best is None or value > best:
+                best = value
+        return best if best is not None else LOST_VALUE
+
+    def _chance_node(self, board, depth, probability):
+        if depth <= 0 or probability < MIN_PROBABILITY:
+            return evaluate(board, self.engine)
+        cached = self._lookup(board, depth)
+        if cached is not None:
+            return cached
+        cells = self.engine.empty_cells(board)
+        if not cells:
+            return evaluate(board, self.engine)
+        total = 0.0
+        for k in cells:
+            shift = k * CELL_BITS
+            for exponent, chance in SPAWNS:
+                p = chance / len(cells)
+                total += p * self._max_node(board | (exponent << shift), depth - 1, probability * p)
+        self._store(board, depth, total)
+        return total
+
+    def best_move(self, board):
+        """Return the best direction for a board int, or None if no move is legal."""
+        candidates = [(direction, result.board) for direction, result in enumerate(self.engine.analyze(board))
+                      if result.legal]
+        if len(candidates) <= 1:
+            return candidates[0][0] if candidates else None
+        best = candidates[0][0]
+        self.deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+        self.depth_reached = 0
+        try:
+            for depth in range(1, self.max_depth + 1):
+                values = [(self._chance_node(moved, depth, 1.0), direction) for direction, moved in candidates]
+                best = max(values)[1]
+                self.depth_reached = depth
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return best
+
+    def choose_move(self, mat):
+        return self.best_move(self.engine.to_board(mat))
+
+
+def play_game(solver, rng=random, max_moves=None):
+    """Play one game with the list-based game functions; return a result dict."""
+    mat = start_game(rng, solver.engine.size)
+    score = 0
+    moves = 0
+    started = time.perf_counter()
+    while not is_game_over(mat) and (max_moves is None or moves < max_moves):
+        direction = solver.choose_move(mat)
+        if direction is None:
+            break
+        score += swipe(mat, direction)
+        add_new(mat, rng)
+        moves += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "score": score,
+        "max_tile": max(max(row) for row in mat),
+        "moves": moves,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play 2048 with the expectimax solver.")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--time", type=float, default=0.05, help="seconds per move")
+    parser.add_argument("--depth", type=int, default=6, help="maximum search depth")
+    parser.add_argument("--table-size", type=int, default=200000)
+    parser.add_argument("--max-moves", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--size", type=int, default=SIZE, help="board size")
+    args = parser.parse_args(argv)
+
+    for game in range(args.games):
+        rng = random.Random(None if args.seed is None else args.seed + game)
+        solver = ExpectimaxSolver(args.time, args.depth, args.table_size, args.size)
+        result = play_game(solver, rng, args.max_moves)
+        print(f"game {game + 1}: score {result['score']}, max tile {result['max_tile']}, "
+              f"{result['moves']} moves in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
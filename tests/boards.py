@@ -0,0 +1,50 @@
+"""Positions shared by the tests that compare fast paths with the game_core swipes.
+
+Positions come from seeded random games on plain mats, plus full boards so
+game-over checks see both outcomes.
+"""
+import random
+
+from game_core import MIN_SIZE, MAX_SIZE, DIRECTIONS, start_game, add_new, swipe, is_game_over
+
+SIZES = range(MIN_SIZE, MAX_SIZE + 1)
+POSITIONS = 300
+
+
+def copy_mat(mat):
+    return [row[:] for row in mat]
+
+
+def positions(size, count=POSITIONS, seed=0):
+    """Mats reached by random play, starting a new game whenever one ends."""
+    rng = random.Random(seed)
+    mat = start_game(rng, size)
+    found = []
+    while len(found) < count:
+        found.append(copy_mat(mat))
+        swipe(mat, rng.choice(DIRECTIONS))
+        add_new(mat, rng)
+        if is_game_over(mat):
+            mat = start_game(rng, size)
+    return found
+
+
+def full_boards(size, count=100, seed=0):
+    """Full mats: random small tiles, which nearly always merge, and checkerboards, which never do."""
+    rng = random.Random(seed)
+    mats = []
+    for k in range(count):
+        if k % 2:
+            pair = rng.sample([2, 4, 8, 16, 32], 2)
+            mats.append([[pair[(i + j) % 2] for j in range(size)] for i in range(size)])
+        else:
+            mats.append([[rng.choice([2, 4, 8, 16]) for _ in range(size)] for _ in range(size)])
+    return mats
+
+
+def expected(mat, direction):
+    """(mat, score, events) after a move on a plain list-of-lists mat."""
+    moved = copy_mat(mat)
+    events = []
+    score = swipe(moved, direction, events)
+    return moved, score, events
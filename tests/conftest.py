@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to this directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point game2048 at a fresh database for the test, then back at the default."""
+    # Imported here so tests that don't use the store don't need bcrypt.
+    import game2048
+
+    # Cheap hashes keep signup and login fast.
+    monkeypatch.setattr(game2048, "BCRYPT_ROUNDS", 4)
+    store = game2048.configure_store(str(tmp_path / "scores.db"))
+    store.create_table()
+    yield store
+    game2048.configure_store()
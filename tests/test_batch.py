@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from boards import SIZES, positions, full_boards, expected
+from game_core import DIRECTIONS, is_game_over
+
+np = pytest.importorskip("numpy")
+import batch
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_move_boards_matches_swipes(size):
+    mats = positions(size) + full_boards(size)
+    for direction in DIRECTIONS:
+        boards = np.array(mats, dtype=np.int64)
+        scores = batch.move_boards(boards, np.full(len(mats), direction))
+        for mat, board, score in zip(mats, boards, scores):
+            moved, gained, _ = expected(mat, direction)
+            assert board.tolist() == moved
+            assert score == gained
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_move_boards_mixed_moves(size):
+    rng = random.Random(size)
+    mats = positions(size)
+    moves = [rng.choice(DIRECTIONS) for _ in mats]
+    boards = np.array(mats, dtype=np.int64)
+    scores = batch.move_boards(boards, moves)
+    for mat, direction, board, score in zip(mats, moves, boards, scores):
+        moved, gained, _ = expected(mat, direction)
+        assert board.tolist() == moved
+        assert score == gained
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_game_over_mask_matches_is_game_over(size):
+    mats = positions(size) + full_boards(size)
+    over = batch.game_over_mask(np.array(mats, dtype=np.int64))
+    assert over.tolist() == [is_game_over(mat) for mat in mats]
+    assert any(over) and not all(over)
+
+
+@pytest.mark.parametrize("make_rng", [random.Random, np.random.default_rng])
+def test_spawning_takes_either_kind_of_rng(make_rng):
+    boards = batch.new_boards(50, make_rng(3), size=4)
+    assert np.array_equal(boards, batch.new_boards(50, make_rng(3), size=4))
+    assert ((boards != 0).sum(axis=(1, 2)) == 2).all()
+    assert np.isin(boards, [0, 2, 4]).all()
+
+    score, over = batch.step(boards, np.zeros(50, dtype=np.int64), make_rng(4))
+    assert score.shape == over.shape == (50,)
+    assert ((boards != 0).sum(axis=(1, 2)) >= 2).all()
+
+
+def test_as_generator_reuses_a_generator():
+    rng = np.random.default_rng(0)
+    assert batch.as_generator(rng) is rng
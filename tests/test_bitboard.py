@@ -0,0 +1,66 @@
+import pytest
+
+import bitboard
+from boards import SIZES, positions, full_boards, expected
+from game_core import DIRECTIONS, is_game_over
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_engine_matches_swipes(size):
+    engine = bitboard.Engine(size)
+    for mat in positions(size) + full_boards(size):
+        board = engine.to_board(mat)
+        assert engine.to_mat(board) == mat
+        assert engine.is_game_over(board) == is_game_over(mat)
+        outcomes = engine.analyze(board)
+        for direction in DIRECTIONS:
+            moved, gained, _ = expected(mat, direction)
+            assert engine.move(board, direction) == (engine.to_board(moved), gained)
+            assert outcomes[direction] == (engine.to_board(moved), gained, moved != mat)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_transpose(size):
+    engine = bitboard.Engine(size)
+    for mat in positions(size):
+        board = engine.to_board(mat)
+        flipped = [list(column) for column in zip(*mat)]
+        assert engine.transpose(board) == engine.to_board(flipped)
+        assert engine.transpose(engine.transpose(board)) == board
+
+
+def test_precompute_matches_lazy_tables():
+    warm = bitboard.Engine(4)
+    warm.precompute(max_exponent=4)
+    cold = bitboard.Engine(4)
+    for mat in positions(4) + full_boards(4):
+        board = cold.to_board(mat)
+        for direction in DIRECTIONS:
+            assert warm.move(board, direction) == cold.move(board, direction)
+
+
+def test_get_engine_cache_size():
+    engine = bitboard.get_engine(6, cache_size=3)
+    try:
+        assert bitboard.get_engine(6) is engine
+        assert engine.cache_size == 3
+        boards = [engine.to_board(mat) for mat in positions(6, 5)]
+        for board in boards:
+            engine.analyze(board)
+        assert list(engine.analysis_cache) == boards[-3:]
+        bitboard.get_engine(6, cache_size=1)
+        assert list(engine.analysis_cache) == boards[-1:]
+    finally:
+        bitboard.get_engine(6, cache_size=bitboard.ANALYSIS_CACHE_SIZE)
+
+
+def test_row_tables_stay_bounded():
+    engine = bitboard.Engine(5)
+    engine.table_size = 50
+    tables = (engine.left_table, engine.right_table, engine.column_table, engine.up_table, engine.down_table)
+    for mat in positions(5) + full_boards(5):
+        board = engine.to_board(mat)
+        for direction in DIRECTIONS:
+            moved, gained, _ = expected(mat, direction)
+            assert engine.move(board, direction) == (engine.to_board(moved), gained)
+        assert all(len(table) <= engine.table_size for table in tables)
@@ -0,0 +1,26 @@
+"""Password hashes follow the configured bcrypt cost factor."""
+import pytest
+
+import game2048
+
+
+def test_login_rehashes_when_the_cost_changes(store, monkeypatch):
+    assert game2048.signup("alice", "secret")[0]
+    assert game2048.hash_rounds(store.get_password("alice")) == 4
+
+    monkeypatch.setattr(game2048, "BCRYPT_ROUNDS", 5)
+    assert game2048.login("alice", "secret")[0]
+    assert game2048.hash_rounds(store.get_password("alice")) == 5
+    assert not game2048.login("alice", "wrong")[0]
+    assert game2048.login("alice", "secret")[0]
+
+
+@pytest.mark.parametrize("value", ["3", "32", "-1", "abc", "", "12.5", None])
+def test_bad_bcrypt_rounds(value):
+    with pytest.raises(ValueError, match="GAME2048_BCRYPT_ROUNDS must be a whole number from 4 to 31"):
+        game2048.parse_bcrypt_rounds(value)
+
+
+def test_bcrypt_rounds_in_range():
+    assert game2048.parse_bcrypt_rounds("4") == 4
+    assert game2048.parse_bcrypt_rounds(31) == 31
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import bitboard
+from boards import SIZES, positions, full_boards, expected, copy_mat
+from game_core import DIRECTIONS, DOWN, Board, start_game, add_new, swipe, swipe_down, is_game_over
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_board_matches_swipes(size):
+    for mat in positions(size) + full_boards(size):
+        assert Board(mat).is_game_over() == is_game_over(mat)
+        for direction in DIRECTIONS:
+            moved, gained, events = expected(mat, direction)
+            board = Board(mat)
+            board_events = []
+            assert board.move(direction, board_events) == gained
+            assert board == moved
+            assert board_events == events
+            assert board.empty_cells() == [(i, j) for i in range(size) for j in range(size) if not moved[i][j]]
+            assert board.is_game_over() == is_game_over(moved)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_seeded_board_game_matches_list_game(size):
+    for seed in range(5):
+        mat_rng, board_rng = random.Random(seed), random.Random(seed)
+        mat = start_game(mat_rng, size)
+        board = Board.new(board_rng, size)
+        assert board == mat
+        for _ in range(500):
+            if is_game_over(mat):
+                break
+            direction = mat_rng.choice(DIRECTIONS)
+            assert board_rng.choice(DIRECTIONS) == direction
+            assert board.move(direction) == swipe(mat, direction)
+            add_new(mat, mat_rng)
+            board.spawn(board_rng)
+            assert board == mat
+        assert board.is_game_over() == is_game_over(mat)
+        assert board.copy() == board
+
+
+# Before the bitboard engine landed, swipe_down merged each column from the
+# bottom but wrote it back from the top, so tiles piled up at the top.
+DOWN_BEFORE = [[2, 0, 4, 0],
+               [2, 0, 0, 8],
+               [4, 0, 4, 0],
+               [4, 2, 0, 0]]
+DOWN_AFTER = [[0, 0, 0, 0],
+              [0, 0, 0, 0],
+              [4, 0, 0, 0],
+              [8, 2, 8, 8]]
+DOWN_SCORE = 4 + 8 + 8
+
+
+def test_swipe_down_stacks_tiles_at_the_bottom():
+    mat = copy_mat(DOWN_BEFORE)
+    assert swipe_down(mat) == DOWN_SCORE
+    assert mat == DOWN_AFTER
+    board = Board(DOWN_BEFORE)
+    assert board.move(DOWN) == DOWN_SCORE
+    assert board == DOWN_AFTER
+    engine = bitboard.get_engine(4)
+    assert engine.move(engine.to_board(DOWN_BEFORE), DOWN) == (engine.to_board(DOWN_AFTER), DOWN_SCORE)
+
+
+class PickIndex:
+    """Stands in for a Random whose choice() returns a fixed index."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def choice(self, seq):
+        return seq[min(self.index, len(seq) - 1)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_spawn_fills_the_kth_empty_cell(size):
+    for mat in positions(size, 60):
+        empty = Board(mat).empty_cells()
+        for k in range(len(empty)):
+            board = Board(mat)
+            board.spawn(PickIndex(k))
+            i, j = empty[k]
+            assert board[i][j] and board.empty_cells() == empty[:k] + empty[k + 1:]
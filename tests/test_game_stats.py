@@ -0,0 +1,72 @@
+import random
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from game_stats import GameRecord, UserStats, create_tables, day_of, insert_games, user_summary
+
+USERS = ["alice", "bob", "carol"]
+START = 1700000000.0
+RECOUNT_USER_STATS = '''SELECT username, COUNT(*), SUM(score), MAX(score), SUM(moves), SUM(duration),
+                               MIN(played_at), MAX(played_at)
+                        FROM games GROUP BY username ORDER BY username'''
+
+
+def random_records(rng, count):
+    records = []
+    for _ in range(count):
+        records.append(GameRecord(
+            username=rng.choice(USERS),
+            score=rng.randrange(0, 50000, 4),
+            max_tile=1 << rng.randint(3, 12),
+            moves=rng.randint(10, 2000),
+            duration=rng.randint(1, 4000) / 4,
+            # Spread over about ten days, out of order, so day and
+            # first/last-played updates cross batches.
+            played_at=START + rng.uniform(0, 10 * 86400),
+            size=rng.choice([4, 5]),
+        ))
+    return records
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    yield conn
+    conn.close()
+
+
+def test_aggregates_match_a_full_recount(conn):
+    rng = random.Random(20)
+    for count in (1, 7, 30, 0, 64, 3):
+        insert_games(conn, random_records(rng, count))
+
+    stats = conn.execute("SELECT * FROM user_stats ORDER BY username").fetchall()
+    assert stats == conn.execute(RECOUNT_USER_STATS).fetchall()
+
+    games = [GameRecord(*row[1:]) for row in conn.execute("SELECT * FROM games")]
+    tiles = Counter((record.username, record.max_tile) for record in games)
+    days = Counter((record.username, day_of(record.played_at)) for record in games)
+    assert dict(((username, tile), n) for username, tile, n
+                in conn.execute("SELECT * FROM user_tile_counts")) == tiles
+    assert dict(((username, day), n) for username, day, n
+                in conn.execute("SELECT * FROM user_daily_games")) == days
+
+
+def test_user_summary(conn):
+    records = [GameRecord("alice", 1000, 128, 100, 60.0, START, 4),
+               GameRecord("alice", 3000, 256, 300, 120.0, START + 3600, 4)]
+    insert_games(conn, records[:1])
+    insert_games(conn, records[1:])
+    summary = user_summary(conn, "alice")
+    assert summary["games"] == 2
+    assert summary["average_score"] == 2000
+    assert summary["best_score"] == 3000
+    assert summary["average_moves"] == 200
+    assert summary["average_duration"] == 90.0
+    assert (summary["first_played"], summary["last_played"]) == (START, START + 3600)
+    assert summary["best_tiles"] == [(256, 1), (128, 1)]
+    assert user_summary(conn, "nobody") is None
+    assert UserStats(*conn.execute("SELECT * FROM user_stats").fetchone()).games == 2
@@ -0,0 +1,96 @@
+"""BoardHistory must keep a bounded window of states with consistent undo/redo."""
+import random
+
+from game_core import DIRECTIONS, Board
+from history import BoardHistory
+from replay import Replay, ReplayPlayer
+
+
+def filled(history, moves):
+    """Reset to board 0 and push boards 1..moves, scoring 10 per move."""
+    history.reset(0, 0)
+    for k in range(1, moves + 1):
+        history.push(k, 10 * k)
+    return history
+
+
+def state_bytes():
+    """Bytes charged for one pushed state; all pushed states in these tests cost the same."""
+    history = filled(BoardHistory(4, max_bytes=None), 0)
+    before = history.nbytes
+    history.push(1, 10)
+    return history.nbytes - before
+
+
+def test_eviction_keeps_the_newest_states():
+    cap = state_bytes() * 5
+    history = filled(BoardHistory(4, max_bytes=cap), 20)
+    assert len(history) == 5
+    assert history.nbytes <= cap
+    assert [board for board, _ in history] == [16, 17, 18, 19, 20]
+    assert history.current() == (20, 200)
+
+
+def test_tiny_cap_keeps_the_current_state():
+    history = filled(BoardHistory(4, max_bytes=1), 3)
+    assert len(history) == 1
+    assert history.current() == (3, 30)
+    assert not history.can_undo()
+
+
+def test_undo_and_redo_stop_at_both_ends():
+    history = filled(BoardHistory(4), 2)
+    assert history.redo() is None
+    assert history.undo() == (1, 10)
+    assert history.undo() == (0, 0)
+    assert history.undo() is None
+    assert history.current() == (0, 0)
+    assert history.redo() == (1, 10)
+    assert history.redo() == (2, 20)
+    assert history.redo() is None
+
+
+def test_push_after_undo_drops_redo_states():
+    history = filled(BoardHistory(4), 3)
+    history.undo()
+    history.undo()
+    history.push(99, 15)
+    assert not history.can_redo()
+    assert history.redo() is None
+    assert [board for board, _ in history] == [0, 1, 99]
+    assert history.undo() == (1, 10)
+
+
+def test_position_counts_evicted_states():
+    history = filled(BoardHistory(4, max_bytes=state_bytes() * 3), 10)
+    assert len(history) == 3
+    assert history.first_position == 8
+    assert history.position == 10
+    history.undo()
+    assert history.position == 9
+    history.push(42, 0)
+    assert history.position == 10
+    history.reset(0, 0)
+    assert history.position == 0
+
+
+def test_replay_history_matches_board_at():
+    size = 4
+    seed = 7
+    rng = random.Random(seed)
+    moves_rng = random.Random(1)
+    board = Board.new(rng, size)
+    moves = []
+    score = 0
+    while not board.is_game_over() and len(moves) < 200:
+        direction = moves_rng.choice(DIRECTIONS)
+        score += board.move(direction)
+        board.spawn(rng)
+        moves.append(direction)
+    player = ReplayPlayer(Replay(seed, moves, score, size), snapshot_every=16)
+    history = player.history()
+    assert len(history) == len(moves) + 1
+    engine = history.engine
+    for n, (packed, packed_score) in enumerate(history):
+        mat, expected_score = player.board_at(n)
+        assert (packed, packed_score) == (engine.to_board(mat), expected_score)
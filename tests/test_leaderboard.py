@@ -0,0 +1,86 @@
+import pytest
+
+from leaderboard import Leaderboard
+from score_store import ScoreStore
+
+# Ties on 300 and 100 exercise the username tie-break at the top, the middle
+# and the bottom of the board.
+SCORES = {"erin": 500, "bob": 300, "alice": 300, "dave": 300, "carol": 200,
+          "frank": 100, "gina": 100}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    store.create_table()
+    for username in SCORES:
+        store.add_user(username, "hash")
+    store.save_high_scores(SCORES)
+    yield store
+    store.close()
+
+
+def ranking(scores):
+    """The expected order: high score descending, ties broken by username."""
+    ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(rank, username, score) for rank, (username, score) in enumerate(ordered, 1)]
+
+
+def test_top(store):
+    board = Leaderboard(store)
+    assert board.top(len(SCORES)) == ranking(SCORES)
+    assert board.top(3) == ranking(SCORES)[:3]
+
+
+def test_rank_breaks_ties_by_username(store):
+    board = Leaderboard(store)
+    for rank, username, _ in ranking(SCORES):
+        assert board.rank(username) == rank
+
+
+@pytest.mark.parametrize("radius", [1, 2, 3])
+def test_around_matches_the_full_ranking(store, radius):
+    board = Leaderboard(store)
+    expected = ranking(SCORES)
+    for k, (_, username, _) in enumerate(expected):
+        assert board.around(username, radius) == expected[max(k - radius, 0):k + radius + 1]
+
+
+def test_around_at_the_top_and_bottom(store):
+    board = Leaderboard(store)
+    expected = ranking(SCORES)
+    assert board.around("erin") == expected[:3]
+    assert board.around("gina") == expected[-3:]
+
+
+def test_unknown_user(store):
+    board = Leaderboard(store)
+    assert board.rank("nobody") is None
+    assert board.around("nobody") == []
+
+
+def test_cache_refreshes_when_the_store_changes(store):
+    board = Leaderboard(store)
+    assert board.rank("gina") == 7
+    assert board.top(1) == [(1, "erin", 500)]
+
+    version = store.version
+    store.save_high_score("gina", 900)
+    assert store.version > version
+    assert board.rank("gina") == 1
+    assert board.top(1) == [(1, "gina", 900)]
+
+    store.add_user("zed", "hash")
+    assert board.rank("zed") == len(SCORES) + 1
+    assert board.around("zed", 1)[-1] == (len(SCORES) + 1, "zed", 0)
+
+
+def test_cache_serves_repeats_without_the_database(store):
+    board = Leaderboard(store)
+    assert board.rank("carol") == 5
+    with store.connection() as conn:
+        # Bypass the store, so its version does not move.
+        conn.execute("UPDATE users SET high_score = 1000 WHERE username = 'carol'")
+    assert board.rank("carol") == 5
+    store.save_high_score("frank", 150)
+    assert board.rank("carol") == 1
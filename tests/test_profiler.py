@@ -0,0 +1,78 @@
+"""Frame timings, percentiles and dumps, without pygame."""
+import csv
+import json
+
+import pytest
+
+from profiler import FRAME, FrameProfiler, percentile
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile([], 0.5) == 0.0
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile(values, 0.0) == 1.0
+
+
+def test_section_ending_after_end_frame_is_left_out():
+    profiler = FrameProfiler()
+    profiler.begin_frame()
+    with profiler.section("events"):
+        with profiler.section("screen"):
+            profiler.end_frame()
+            profiler.begin_frame()
+    with profiler.section("draw_grid"):
+        pass
+    profiler.end_frame()
+    first, second = profiler._frames
+    assert set(first) == {FRAME}
+    assert set(second) == {FRAME, "draw_grid"}
+    assert profiler.sections == ["draw_grid"]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = FrameProfiler(enabled=False)
+    profiler.begin_frame()
+    with profiler.section("events"):
+        pass
+    profiler.end_frame()
+    assert profiler.summary() == {}
+
+
+@pytest.fixture
+def profiler():
+    profiler = FrameProfiler()
+    for sections in (("events", "draw_grid"), ("events",)):
+        profiler.begin_frame()
+        for name in sections:
+            with profiler.section(name):
+                pass
+        profiler.end_frame()
+    return profiler
+
+
+def test_json_dump_leaves_out_sections_that_did_not_run(profiler, tmp_path):
+    path = str(tmp_path / "profile.json")
+    profiler.dump(path)
+    with open(path) as f:
+        data = json.load(f)
+    assert set(data["summary"]) == {FRAME, "events", "draw_grid"}
+    assert data["summary"]["draw_grid"]["samples"] == 1
+    first, second = data["frames"]
+    assert set(first) == {FRAME, "events", "draw_grid"}
+    assert set(second) == {FRAME, "events"}
+
+
+def test_csv_dump_leaves_out_sections_that_did_not_run(profiler, tmp_path):
+    path = str(tmp_path / "profile.csv")
+    profiler.dump(path)
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["index", "frame_ms", "events_ms", "draw_grid_ms"]
+    assert rows[0]["draw_grid_ms"] != ""
+    assert rows[1]["draw_grid_ms"] == ""
+    assert rows[1]["events_ms"] != ""
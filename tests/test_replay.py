@@ -0,0 +1,51 @@
+"""Recorded games must replay to the same boards and scores."""
+import random
+
+import pytest
+
+from boards import SIZES
+from game_core import DIRECTIONS, Board
+from replay import Replay, ReplayRecorder, ReplayPlayer, append_replay, read_replays, encode_replay, decode_replay
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_replay_round_trip(size, tmp_path):
+    path = str(tmp_path / "replays.bin")
+    recorder = ReplayRecorder(path, size)
+    played = []
+    for game in range(3):
+        rng = recorder.start()
+        moves_rng = random.Random(game)
+        board = Board.new(rng, size)
+        score = 0
+        for _ in range(300):
+            if board.is_game_over():
+                break
+            direction = moves_rng.choice(DIRECTIONS)
+            score += board.move(direction)
+            board.spawn(rng)
+            recorder.record(direction)
+        played.append((recorder.finish(score), board))
+
+    replays = list(read_replays(path))
+    assert replays == [replay for replay, _ in played]
+    for replay, board in played:
+        assert decode_replay(encode_replay(replay)) == (replay, len(encode_replay(replay)))
+        player = ReplayPlayer(replay, snapshot_every=16)
+        assert player.verify()
+        assert player.final() == (board, replay.score)
+        middle = len(replay.moves) // 2
+        assert player.board_at(middle) == ReplayPlayer(replay).board_at(middle)
+
+
+def test_read_replays_rejects_a_truncated_record(tmp_path):
+    path = str(tmp_path / "replays.bin")
+    first = Replay(1, [0, 1, 2, 3, 0], 16, 4)
+    append_replay(path, first)
+    append_replay(path, Replay(2, [3, 2, 1], 8, 4))
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 1)
+    replays = read_replays(path)
+    assert next(replays) == first
+    with pytest.raises(ValueError):
+        next(replays)
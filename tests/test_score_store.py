@@ -0,0 +1,23 @@
+"""ScoreStore.close() must close every connection, borrowed or idle."""
+import sqlite3
+
+import pytest
+
+from score_store import ScoreStore
+
+
+def test_close_while_borrowed_closes_the_connection(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    store.create_table()
+    with store.connection() as borrowed:
+        with store.connection() as idle:
+            pass
+        store.close()
+        borrowed.execute("SELECT 1")
+    assert idle is not borrowed
+    for conn in (idle, borrowed):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        with store.connection():
+            pass
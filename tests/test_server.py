@@ -0,0 +1,53 @@
+import asyncio
+import random
+
+import pytest
+
+from game_core import LEFT, RIGHT, UP, DOWN, SIZE
+from server import GameClient, GameServer
+
+
+async def session(server):
+    client = await GameClient.connect(port=server.port)
+    assert await client.request("NEW x") == "ERR Usage: NEW [size]"
+    assert (await client.request("NEW 99")).startswith("ERR ")
+    assert await client.request("STATE") == "ERR No game; send NEW"
+
+    await client.signup("alice", "secret")
+    assert await client.login("alice", "secret") == 0
+    with pytest.raises(ValueError):
+        await client.login("alice", "wrong")
+
+    score, high_score, over, mat = await client.new_game()
+    assert (score, over, len(mat)) == (0, False, SIZE)
+    assert sum(1 for row in mat for value in row if value) == 2
+    for direction in (LEFT, UP, RIGHT, DOWN):
+        moved = await client.move(direction)
+        if moved[3] != mat:
+            break
+    assert moved[3] != mat
+    assert sum(1 for row in moved[3] for value in row if value) >= 2
+
+    reply = await client.request("STATE")
+    assert reply.startswith("S ")
+    assert await client._state("STATE") == moved
+
+    assert await client.request("QUIT") == "BYE"
+    client.writer.close()
+    await client.writer.wait_closed()
+
+
+def test_client_session(store):
+    async def main():
+        server = GameServer(port=0, rng=random.Random(0))
+        await server.start()
+        assert server.port != 0
+        try:
+            await session(server)
+        finally:
+            await server.close()
+        return server
+
+    server = asyncio.run(main())
+    assert server.moves >= 1
+    assert server.sessions == 0
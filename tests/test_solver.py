@@ -0,0 +1,85 @@
+import pytest
+
+import bitboard
+import solver
+from boards import SIZES, positions
+from game_core import DIRECTIONS, LEFT, RIGHT, UP
+from solver import LOST_VALUE, MIN_EVALUATION, ExpectimaxSolver, evaluate, hint
+
+
+def checkerboard(size, a, b):
+    return [[a if (i + j) % 2 else b for j in range(size)] for i in range(size)]
+
+
+def test_live_board_with_big_tiles_beats_a_dead_one():
+    engine = bitboard.get_engine(5)
+    dead = engine.to_board(checkerboard(5, 1024, 2))
+    live_mat = checkerboard(5, 1024, 2)
+    live_mat[0][0] = 0  # one free cell; sliding into it keeps the game going
+    live = engine.to_board(live_mat)
+    assert engine.is_game_over(dead)
+    assert not engine.is_game_over(live)
+
+    solver = ExpectimaxSolver(time_budget=None, size=5)
+    assert solver._max_node(dead, 1, 1.0) == LOST_VALUE
+    assert solver._max_node(live, 1, 1.0) > LOST_VALUE
+    assert evaluate(live, engine) < 0.0
+    assert evaluate(live, engine) > LOST_VALUE
+
+
+def test_solver_avoids_the_losing_move():
+    engine = bitboard.get_engine(3)
+    # Right and up leave one free cell whose spawn always ends the game; the
+    # big out-of-order tiles make every live reply score below 0.
+    mat = [[1024, 256, 2],
+           [8, 0, 1024],
+           [2048, 512, 8]]
+    board = engine.to_board(mat)
+    outcomes = engine.analyze(board)
+    losing = [direction for direction in DIRECTIONS if outcomes[direction].legal
+              and all(engine.is_game_over(outcomes[direction].board | (exponent << (k * bitboard.CELL_BITS)))
+                      for k in engine.empty_cells(outcomes[direction].board) for exponent in (1, 2))]
+    assert losing == [RIGHT, UP]
+    solver = ExpectimaxSolver(time_budget=None, max_depth=1, size=3)
+    assert solver.best_move(board) not in losing
+
+
+def test_hint_picks_a_legal_move():
+    engine = bitboard.get_engine(3)
+    # Only the top row can move: its 2s merge to the left or to the right.
+    board = engine.to_board([[2, 2, 4],
+                             [4, 8, 16],
+                             [8, 16, 32]])
+    legal = [direction for direction in DIRECTIONS if engine.analyze(board)[direction].legal]
+    assert legal == [LEFT, RIGHT]
+    assert hint(board, engine) in legal
+
+
+def test_hint_on_a_dead_board_is_none():
+    engine = bitboard.get_engine(5)
+    dead = engine.to_board(checkerboard(5, 1024, 2))
+    assert engine.is_game_over(dead)
+    assert hint(dead, engine) is None
+
+
+def test_row_score_cache_stays_bounded(monkeypatch):
+    monkeypatch.setattr(solver, "ROW_TABLE_SIZE", 20)
+    monkeypatch.setattr(solver, "_row_scores", {})
+    engine = bitboard.get_engine(4)
+    for mat in positions(4, 100):
+        board = engine.to_board(mat)
+        cold = solver.evaluate(board, engine)
+        assert solver.evaluate(board, engine) == cold
+        assert len(solver._row_scores[4]) <= 20
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_extreme_boards_score_above_lost_value(size):
+    engine = bitboard.get_engine(size)
+    top = bitboard.MAX_EXPONENT
+    full = sum(top << (k * bitboard.CELL_BITS) for k in range(engine.cells))
+    # Alternating the biggest and smallest tiles is the least monotonic line.
+    zigzag = sum((top if (k + k // size) % 2 else 1) << (k * bitboard.CELL_BITS) for k in range(engine.cells))
+    for board in (full, zigzag):
+        assert MIN_EVALUATION <= evaluate(board, engine) < 0.0
+        assert evaluate(board, engine) > LOST_VALUE
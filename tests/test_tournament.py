@@ -0,0 +1,48 @@
+"""Tournament games are reproducible per seed and policies load by name or path."""
+import pytest
+
+import bitboard
+from tournament import load_policy, run_game
+
+RESULT_FIELDS = {"game", "policy", "seed", "size", "score", "max_tile", "moves", "seconds", "moves_per_sec"}
+
+
+def make_first_legal_policy(engine, **options):
+    """Loaded by path in the tests below: always plays the first legal move."""
+    def policy(board, rng):
+        return next(direction for direction, result in enumerate(engine.analyze(board)) if result.legal)
+    policy.engine = engine
+    policy.options = options
+    return policy
+
+
+def without_timing(result):
+    return {key: value for key, value in result.items() if key not in ("seconds", "moves_per_sec")}
+
+
+@pytest.mark.parametrize("policy_name", ["random", "greedy"])
+def test_run_game_is_reproducible(policy_name):
+    first = run_game(3, policy_name, 42, {}, max_moves=200, size=4)
+    second = run_game(3, policy_name, 42, {}, max_moves=200, size=4)
+    assert set(first) == RESULT_FIELDS
+    assert without_timing(first) == without_timing(second)
+    assert (first["game"], first["policy"], first["seed"], first["size"]) == (3, policy_name, 42, 4)
+    assert 0 < first["moves"] <= 200
+    assert first["max_tile"] >= 4
+    assert without_timing(run_game(3, policy_name, 43, {}, max_moves=200, size=4)) != without_timing(first)
+
+
+def test_load_policy_by_import_path():
+    engine = bitboard.get_engine(4)
+    policy = load_policy("test_tournament:make_first_legal_policy", engine, depth=2)
+    assert policy.engine is engine
+    assert policy.options == {"depth": 2}
+    board = engine.to_board([[0, 0, 0, 2], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+    assert policy(board, None) == 0
+    result = run_game(0, "test_tournament:make_first_legal_policy", 1, {}, max_moves=50, size=4)
+    assert result["moves"] > 0
+
+
+def test_load_policy_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        load_policy("no-such-policy")
@@ -0,0 +1,64 @@
+"""Exported rows must map back to the boards, moves and rewards written."""
+import pytest
+
+from game_core import LEFT, RIGHT, UP, DOWN
+
+np = pytest.importorskip("numpy")
+from training_export import HEADER_SIZE, TrainingWriter, open_memmap, row_struct
+
+MAT = [[2, 0, 4, 0],
+       [0, 8, 0, 0],
+       [0, 0, 2048, 0],
+       [0, 0, 0, 2]]
+EXPONENTS = [1, 0, 2, 0, 0, 3, 0, 0, 0, 0, 11, 0, 0, 0, 0, 1]
+
+
+def test_writer_round_trip(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with TrainingWriter(path, 4) as writer:
+        writer.append(MAT, LEFT, 0)
+        writer.append(MAT, DOWN, 4096)
+    rows = open_memmap(path)
+    assert len(rows) == 2
+    assert rows["board"][0].tolist() == EXPONENTS
+    assert rows["board"][1].tolist() == EXPONENTS
+    assert rows["move"].tolist() == [LEFT, DOWN]
+    assert rows["reward"].tolist() == [0, 4096]
+
+
+def test_reopen_appends(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with TrainingWriter(path, 4) as writer:
+        writer.append(MAT, LEFT, 4)
+    with TrainingWriter(path, 4) as writer:
+        assert writer.count == 1
+        writer.append(MAT, RIGHT, 8)
+        writer.append(MAT, UP, 16)
+    rows = open_memmap(path)
+    assert rows["move"].tolist() == [LEFT, RIGHT, UP]
+    assert rows["reward"].tolist() == [4, 8, 16]
+
+
+def test_uncommitted_rows_are_truncated(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with TrainingWriter(path, 4) as writer:
+        writer.append(MAT, LEFT, 4)
+    # A crashed run: rows appended but the header count never updated.
+    with open(path, "ab") as f:
+        f.write(b"\xff" * (row_struct(4).size * 2 + 3))
+    with TrainingWriter(path, 4) as writer:
+        assert writer.count == 1
+        writer.append(MAT, UP, 32)
+    rows = open_memmap(path)
+    assert rows["move"].tolist() == [LEFT, UP]
+    assert rows["reward"].tolist() == [4, 32]
+    assert (tmp_path / "positions.bin").stat().st_size == HEADER_SIZE + 2 * row_struct(4).size
+
+
+def test_rejects_other_board_size(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with TrainingWriter(path, 4) as writer:
+        writer.append(MAT, LEFT, 0)
+    with pytest.raises(ValueError):
+        TrainingWriter(path, 5)
+    assert len(open_memmap(path)) == 1
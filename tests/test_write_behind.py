@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+from score_store import ScoreStore
+from write_behind import GameRecordWriter, HighScoreWriter
+
+# Long enough that the background thread only writes when asked to.
+INTERVAL = 60.0
+
+
+class FakeStore:
+    """Records every batch it is given; fails the first `failures` writes."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def save_high_scores(self, scores):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.batches.append(dict(scores))
+
+    def record_games(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.batches.append(list(records))
+
+
+def test_repeated_submits_collapse_to_the_maximum():
+    store = FakeStore()
+    writer = HighScoreWriter(store, interval=INTERVAL)
+    for score in (100, 400, 250):
+        writer.submit("alice", score)
+    writer.submit("bob", 50)
+    assert writer.pending() == {"alice": 400, "bob": 50}
+    writer.flush()
+    assert store.batches == [{"alice": 400, "bob": 50}]
+    assert writer.pending() == {}
+    writer.close()
+
+
+def test_failed_batch_is_put_back_and_retried():
+    store = FakeStore(failures=1)
+    writer = HighScoreWriter(store, interval=INTERVAL)
+    writer.submit("alice", 400)
+    writer.submit("bob", 50)
+    with pytest.raises(sqlite3.Error):
+        writer.flush()
+    assert store.batches == []
+    # Updates made while the batch was out merge with it by maximum.
+    writer.submit("alice", 300)
+    writer.submit("bob", 70)
+    assert writer.pending() == {"alice": 400, "bob": 70}
+    writer.flush()
+    assert store.batches == [{"alice": 400, "bob": 70}]
+    writer.close()
+
+
+def test_failed_game_records_keep_their_order():
+    store = FakeStore(failures=1)
+    writer = GameRecordWriter(store, interval=INTERVAL)
+    writer.submit("first")
+    writer.submit("second")
+    with pytest.raises(sqlite3.Error):
+        writer.flush()
+    writer.submit("third")
+    writer.flush()
+    assert store.batches == [["first", "second", "third"]]
+    writer.close()
+
+
+def test_close_writes_everything_pending(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    store.create_table()
+    store.add_user("alice", "hash")
+    writer = HighScoreWriter(store, interval=INTERVAL)
+    writer.submit("alice", 128)
+    writer.submit("alice", 512)
+    writer.close()
+    assert writer.pending() == {}
+    assert store.get_high_score("alice") == 512
+    with pytest.raises(RuntimeError):
+        writer.submit("alice", 1024)
+    store.close()
+
+
+def test_close_writes_pending_game_records():
+    store = FakeStore()
+    writer = GameRecordWriter(store, interval=INTERVAL)
+    writer.submit("first")
+    writer.submit("second")
+    writer.close()
+    assert store.batches == [["first", "second"]]
@@ -0,0 +1,155 @@
+"""Self-play tournament runner.
+
+Plays K games across all cores with a pluggable policy and streams one JSON
+line per finished game.  Every game gets its own seed (base seed + game
+index), so a run is reproducible no matter how games land on workers.
+
+Usage:
+    python tournament.py --games 100 --policy greedy --seed 1 > results.jsonl
+    python tournament.py --games 8 --policy expectimax --time 0.02
+    python tournament.py --games 8 --policy mypackage.bots:make_policy
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import bitboard
+from game_core import SIZE
+
+
+def legal_moves(board, engine=bitboard.get_engine()):
+    """Return [(direction, new_board, score)] for every move that changes the board."""
+    return [(direction, moved, score) for direction, (moved, score, legal) in enumerate(engine.analyze(board))
+            if legal]
+
+
+def make_random_policy(engine=bitboard.get_engine(), **options):
+    def policy(board, rng):
+        return rng.choice(legal_moves(board, engine))[0]
+    return policy
+
+
+def make_greedy_policy(engine=bitboard.get_engine(), **options):
+    def policy(board, rng):
+        moves = legal_moves(board, engine)
+        best = max(score for _, _, score in moves)
+        return rng.choice([direction for direction, _, score in moves if score == best])
+    return policy
+
+
+def make_expectimax_policy(engine=bitboard.get_engine(), time_budget=0.05, max_depth=6, **options):
+    from solver import ExpectimaxSolver
+    solver = ExpectimaxSolver(time_budget, max_depth, size=engine.size)
+
+    def policy(board, rng):
+        return solver.best_move(board)
+    return policy
+
+
+POLICIES = {
+    "random": make_random_policy,
+    "greedy": make_greedy_policy,
+    "expectimax": make_expectimax_policy,
+}
+
+
+def load_policy(name, engine=None, **options):
+    """Build a policy by registry name or "module:factory" import path.
+
+    Factories are called with the board's bitboard Engine as ``engine`` plus
+    any extra options, and return a ``policy(board, rng) -> direction``.
+    """
+    if name in POLICIES:
+        factory = POLICIES[name]
+    elif ":" in name:
+        module_name, attr = name.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), attr)
+    else:
+        raise ValueError(f"Unknown policy: {name}")
+    return factory(engine=engine or bitboard.get_engine(), **options)
+
+
+def play_game(policy, rng, max_moves=None, engine=bitboard.get_engine()):
+    board = engine.add_random_tile(engine.add_random_tile(0, rng), rng)
+    score = 0
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        results = engine.analyze(board)
+        if not any(result.legal for result in results):
+            break
+        direction = policy(board, rng)
+        moved, gained, legal = results[direction]
+        if not legal:
+            break
+        board = engine.add_random_tile(moved, rng)
+        score += gained
+        moves += 1
+    return board, score, moves
+
+
+def run_game(game, policy_name, seed, options, max_moves=None, size=SIZE):
+    """Worker entry point: play one seeded game and return its result dict."""
+    engine = bitboard.get_engine(size)
+    rng = random.Random(seed)
+    policy = load_policy(policy_name, engine, **options)
+    started = time.perf_counter()
+    board, score, moves = play_game(policy, rng, max_moves, engine)
+    elapsed = time.perf_counter() - started
+    return {
+        "game": game,
+        "policy": policy_name,
+        "seed": seed,
+        "size": size,
+        "score": score,
+        "max_tile": engine.max_tile(board),
+        "moves": moves,
+        "seconds": round(elapsed, 4),
+        "moves_per_sec": round(moves / elapsed, 1) if elapsed else None,
+    }
+
+
+def run_tournament(games, policy_name, seed=0, workers=None, options=None, max_moves=None, size=SIZE):
+    """Yield result dicts as games finish."""
+    options = options or {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_game, game, policy_name, seed + game, options, max_moves, size)
+                   for game in range(games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run 2048 self-play games in parallel.")
+    parser.add_argument("--games", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--policy", default="random",
+                        help="random, greedy, expectimax or module:factory")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i uses seed + i")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to all cores")
+    parser.add_argument("--time", type=float, default=0.05, help="expectimax seconds per move")
+    parser.add_argument("--depth", type=int, default=6, help="expectimax maximum depth")
+    parser.add_argument("--max-moves", type=int, default=None)
+    parser.add_argument("--size", type=int, default=SIZE, help="board size")
+    parser.add_argument("--output", default="-", help="JSON Lines file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.policy == "expectimax":
+        options = {"time_budget": args.time, "max_depth": args.depth}
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        for result in run_tournament(args.games, args.policy, args.seed, args.workers, options, args.max_moves, args.size):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
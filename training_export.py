@@ -0,0 +1,173 @@
+"""Export (board, move, reward) rows for training move-prediction models.
+
+The file is a 64-byte header followed by fixed-width little-endian rows:
+
+    board   size*size x uint8   log2 exponent of every tile, row-major (0 = empty)
+    move    uint8               LEFT/RIGHT/UP/DOWN code played from that board
+    reward  uint32              score gained by the move
+
+Rows are only ever appended, and the row count in the header is updated
+when a writer closes, so open_memmap() can map the rows with NumPy without
+copying or parsing anything.
+
+Usage:
+    python training_export.py positions.bin --replays replays.bin
+    python training_export.py positions.bin --selfplay 1000 --policy greedy --seed 0
+"""
+import argparse
+import os
+import random
+import struct
+
+import bitboard
+from game_core import SIZE, Board
+
+MAGIC = b"T2048EXP"
+VERSION = 1
+HEADER_FIELDS = "<8sHBH"  # magic, version, board size, row size
+HEADER = struct.Struct(HEADER_FIELDS + "Q")  # followed by the row count
+HEADER_SIZE = 64
+COUNT_OFFSET = struct.calcsize(HEADER_FIELDS)
+
+
+def row_struct(size):
+    return struct.Struct(f"<{size * size}sBI")
+
+
+def board_exponents(mat):
+    return bytes(value.bit_length() - 1 if value else 0 for row in mat for value in row)
+
+
+def row_dtype(size):
+    import numpy as np
+    return np.dtype([("board", "u1", (size * size,)), ("move", "u1"), ("reward", "<u4")])
+
+
+def read_header(f):
+    f.seek(0)
+    data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Missing training export header")
+    magic, version, size, row_size, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a training export file")
+    return size, row_size, count
+
+
+class TrainingWriter:
+    def __init__(self, path, size=SIZE):
+        self.path = path
+        self.size = size
+        self.row = row_struct(size)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file = open(path, "r+b")
+            try:
+                file_size, row_size, self.count = read_header(self.file)
+                if file_size != size or row_size != self.row.size:
+                    raise ValueError(f"{path} holds {file_size}x{file_size} rows, not {size}x{size}")
+            except Exception:
+                self.file.close()
+                raise
+            # Drop anything written after the last committed count, e.g. by a crashed run.
+            self.file.truncate(HEADER_SIZE + self.count * self.row.size)
+        else:
+            self.file = open(path, "w+b")
+            self.count = 0
+            self.file.write(HEADER.pack(MAGIC, VERSION, size, self.row.size, 0).ljust(HEADER_SIZE, b"\0"))
+        self.file.seek(0, os.SEEK_END)
+
+    def append(self, mat, move, reward):
+        self.file.write(self.row.pack(board_exponents(mat), move, reward))
+        self.count += 1
+
+    def commit(self):
+        """Flush rows and publish the new row count in the header."""
+        self.file.flush()
+        self.file.seek(COUNT_OFFSET)
+        self.file.write(struct.pack("<Q", self.count))
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+    def close(self):
+        self.commit()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_replays(writer, replay_path):
+    """Replay every recorded game and append one row per move; return the game count."""
+    from replay import read_replays
+
+    games = 0
+    for replay in read_replays(replay_path):
+        if replay.size != writer.size:
+            continue
+        rng = random.Random(replay.seed)
+        board = Board.new(rng, writer.size)
+        for direction in replay.moves:
+            before = [row[:] for row in board]
+            writer.append(before, direction, board.move(direction))
+            board.spawn(rng)
+        games += 1
+    return games
+
+
+def export_selfplay(writer, games, policy_name="greedy", seed=0, options=None):
+    """Play games with a tournament policy and append one row per move."""
+    from tournament import load_policy
+
+    engine = bitboard.get_engine(writer.size)
+    for game in range(games):
+        rng = random.Random(seed + game)
+        policy = load_policy(policy_name, engine, **(options or {}))
+        board = Board.new(rng, writer.size)
+        while not board.is_game_over():
+            direction = policy(engine.to_board(board), rng)
+            before = [row[:] for row in board]
+            writer.append(before, direction, board.move(direction))
+            board.spawn(rng)
+    return games
+
+
+def open_memmap(path):
+    """Map the rows of an export file as a read-only NumPy structured array."""
+    import numpy as np
+
+    with open(path, "rb") as f:
+        size, row_size, count = read_header(f)
+    dtype = row_dtype(size)
+    if dtype.itemsize != row_size:
+        raise ValueError("Row layout does not match this reader")
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export 2048 positions for model training.")
+    parser.add_argument("output")
+    parser.add_argument("--replays", metavar="PATH", help="replay file to export")
+    parser.add_argument("--selfplay", type=int, default=0, metavar="GAMES", help="self-play games to export")
+    parser.add_argument("--policy", default="greedy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=SIZE, help="board size of the exported rows")
+    args = parser.parse_args(argv)
+
+    with TrainingWriter(args.output, args.size) as writer:
+        start = writer.count
+        if args.replays:
+            games = export_replays(writer, args.replays)
+            print(f"Exported {games} replayed games")
+        if args.selfplay:
+            export_selfplay(writer, args.selfplay, args.policy, args.seed)
+            print(f"Exported {args.selfplay} self-play games")
+        print(f"{writer.count - start} rows added, {writer.count} total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Write-behind queues for high-score updates and finished-game records.
+
+submit() only records the update in memory, so the game loop never waits
+on a disk commit.  A background thread writes everything pending in one
+transaction every ``interval`` seconds, when a flush is requested, and on
+close().  Repeated high-score updates for a user collapse to the highest
+value; game records are kept in order and inserted as one batch.
+"""
+import sqlite3
+import threading
+
+
+class WriteBehind:
+    """Background-flushed buffer; subclasses say how to take, restore and write a batch."""
+
+    description = "updates"
+
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError(f"{type(self).__name__} is closed")
+
+    def _take(self):
+        raise NotImplementedError
+
+    def _restore(self, batch):
+        raise NotImplementedError
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def request_flush(self):
+        """Ask the background thread to write now without waiting for it."""
+        self._wake.set()
+
+    def flush(self):
+        """Write everything pending before returning."""
+        with self._write_lock:
+            with self._lock:
+                batch = self._take()
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except sqlite3.Error:
+                # Put the batch back so the next flush retries it.
+                with self._lock:
+                    self._restore(batch)
+                raise
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error saving {self.description}: {e}")
+
+    def close(self):
+        """Stop the background thread and write whatever is still pending."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+class HighScoreWriter(WriteBehind):
+    description = "high scores"
+
+    def __init__(self, store, interval=5.0):
+        self.store = store
+        self._pending = {}
+        super().__init__(interval)
+
+    def submit(self, username, score):
+        self._check_open()
+        with self._lock:
+            if score > self._pending.get(username, score - 1):
+                self._pending[username] = score
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def _take(self):
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _restore(self, batch):
+        for username, score in batch.items():
+            if score > self._pending.get(username, score - 1):
+                self._pending[username] = score
+
+    def _write(self, batch):
+        self.store.save_high_scores(batch)
+
+
+class GameRecordWriter(WriteBehind):
+    description = "game statistics"
+
+    def __init__(self, stats, interval=5.0):
+        self.stats = stats
+        self._pending = []
+        super().__init__(interval)
+
+    def submit(self, record):
+        self._check_open()
+        with self._lock:
+            self._pending.append(record)
+
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _restore(self, batch):
+        self._pending[:0] = batch
+
+    def _write(self, batch):
+        self.stats.record_games(batch)